@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import zlib
+
+TESTBOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTBOT_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, TESTBOT_DIR)
+
+import aiohttp
+import discord
+
+from assetCache import AssetCache
+from fakeDiscord import FakeDiscord
+
+ASSET_CHANNEL_ID = 800000000000000100
+
+
+def make_png(width: int, height: int, rgb) -> bytes:
+    # A solid-colour PNG, enough to give every test image distinct bytes
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + bytes(rgb) * width for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+async def run(args) -> int:
+    fake = FakeDiscord([ASSET_CHANNEL_ID], latency=args.latency / 1000, jitter=0.0,
+                       attachment_ttl=args.attachment_ttl).start()
+    discord.http.Route.BASE = f"{fake.base_url}/api/v10"
+    client = discord.Client(intents=discord.Intents.none())
+    await client.login("fake-token")
+    channel = client.get_partial_messageable(ASSET_CHANNEL_ID)
+
+    directory = tempfile.mkdtemp(prefix="helpbot-assets-")
+    db_path = os.path.join(directory, "assets.db")
+    images = os.path.join(directory, "images")
+    os.makedirs(images)
+    with open(os.path.join(images, "vipRequirements.png"), "wb") as f:
+        f.write(make_png(64, 32, (52, 152, 219)))
+    with open(os.path.join(images, "giftCodes.png"), "wb") as f:
+        f.write(make_png(64, 32, (231, 76, 60)))
+
+    failures = []
+
+    def expect(step: str, uploads: int, expected: int):
+        print(f"{step}: {uploads} uploads (expected {expected})")
+        if uploads != expected:
+            failures.append(step)
+
+    try:
+        cache = AssetCache(images, db_path)
+        expect("First sync", await cache.sync(channel), 2)
+        url = cache.url("vipRequirements.png")
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as response:
+                served = await response.read()
+        with open(os.path.join(images, "vipRequirements.png"), "rb") as f:
+            if served != f.read():
+                failures.append("CDN URL serves different bytes")
+        print(f"CDN URL: {url}")
+
+        expect("Sync again", await cache.sync(channel), 0)
+        restarted = AssetCache(images, db_path)  # a new process reading the same database
+        expect("Sync after a restart", await restarted.sync(channel), 0)
+        if restarted.url("vipRequirements.png") != url:
+            failures.append("URL changed across a restart")
+
+        shutil.copy(os.path.join(images, "vipRequirements.png"), os.path.join(images, "vipCopy.png"))
+        expect("Sync with a duplicate image", await restarted.sync(channel), 0)
+        if restarted.url("vipCopy.png") != url:
+            failures.append("Identical image got a different URL")
+
+        with open(os.path.join(images, "giftCodes.png"), "wb") as f:
+            f.write(make_png(64, 32, (46, 204, 113)))
+        expect("Sync after editing an image", await restarted.sync(channel), 1)
+
+        expiring = AssetCache(images, db_path, refresh_margin=args.attachment_ttl + 60)
+        expect("Sync with every URL near expiry", await expiring.sync(channel), 2)
+    finally:
+        await client.close()
+        fake.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"REST calls: {dict(fake.calls)}")
+    if failures:
+        print("Failed: " + ", ".join(failures))
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the response image cache against a local fake Discord.")
+    parser.add_argument("--latency", type=float, default=20, help="simulated REST latency in ms")
+    parser.add_argument("--attachment-ttl", type=float, default=86400, help="seconds the fake CDN URLs stay valid")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from helpRules import RULES
+from ruleEngine import compile_rules
+
+QUESTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questions.txt")
+CHATTER_WORDS = ["lol", "gg", "ok", "thanks", "brb", "nice", "rally", "up", "now", "pls", "join", "me",
+                 "good", "morning", "night", "yes", "no", "shield", "attack", "coords", "incoming", "help"]
+
+
+def make_chatter(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(CHATTER_WORDS) for _ in range(rng.randint(2, 12))) for _ in range(count)]
+
+
+def main():
+    start = time.perf_counter()
+    matcher = compile_rules(RULES)
+    print(f"Compiled {len(matcher.rules)} rules in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            question = line.strip()
+            if question:
+                rule = matcher.match(question.casefold())
+                print(f"  {rule.intent if rule else '-':<20} {question[:70]}")
+
+    chatter = [message.casefold() for message in make_chatter(50000)]
+    matched = sum(1 for message in chatter if matcher.match(message))
+    start = time.perf_counter()
+    for message in chatter:
+        matcher.match(message)
+    elapsed = time.perf_counter() - start
+    print(f"Non-matching chatter: {len(chatter)} messages, {matched} matched, "
+          f"{elapsed / len(chatter) * 1e6:.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
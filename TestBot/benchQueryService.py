@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import sys
+import time
+
+TESTBOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTBOT_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, TESTBOT_DIR)
+
+import aiohttp
+from aiohttp import web
+
+from benchMatcher import make_chatter
+from benchReplay import load_questions, percentile
+
+
+async def run(args) -> int:
+    os.chdir(ROOT)  # helpEngine loads its data files relative to the working directory
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        import queryService
+
+    runner = web.AppRunner(queryService.make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/query"
+
+    rng = random.Random(args.seed)
+    questions = load_questions()
+    corpus = questions + make_chatter(len(questions) * 9, seed=args.seed)
+    latencies = []
+    answered = 0
+
+    async def client(session: aiohttp.ClientSession, deadline: float):
+        nonlocal answered
+        while time.monotonic() < deadline:
+            batch = [rng.choice(corpus) for _ in range(args.batch)]
+            start = time.perf_counter()
+            async with session.post(url, json={"questions": batch}) as response:
+                body = await response.json()
+            latencies.append(time.perf_counter() - start)
+            answered += len(body["answers"])
+
+    # One pooled session: connections are kept alive between requests
+    connector = aiohttp.TCPConnector(limit=args.connections)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.monotonic()
+        await asyncio.gather(*(client(session, start + args.duration) for _ in range(args.connections)))
+        elapsed = time.monotonic() - start
+    await runner.cleanup()
+
+    print(f"{args.connections} connections, batches of {args.batch}, {elapsed:.2f}s (client and server share one core)")
+    print(f"Answered {answered} questions in {len(latencies)} requests: {answered / elapsed:,.0f} questions/s")
+    print("Request latency: " + "  ".join(f"p{int(q * 100)} {percentile(latencies, q) * 1000:.2f} ms" for q in (0.5, 0.99)))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive queryService over HTTP with batched questions.")
+    parser.add_argument("--connections", type=int, default=8, help="concurrent keep-alive connections")
+    parser.add_argument("--batch", type=int, default=50, help="questions per request")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of load")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+TESTBOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTBOT_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, TESTBOT_DIR)
+
+from benchMatcher import make_chatter
+
+QUESTIONS_FILE = os.path.join(TESTBOT_DIR, "questions.txt")
+REQUESTS_FILE = os.path.join(ROOT, "requests.jsonl")
+BASELINE_FILE = os.path.join(TESTBOT_DIR, "benchBaseline.json")
+BASELINE_CORPORA = ("questions", "chatter")  # requests.jsonl is not part of the repo
+
+
+def load_questions(path=QUESTIONS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def load_requests(path=REQUESTS_FILE):
+    # Each JSON line contributes its title and body as chat messages
+    messages = []
+    if not os.path.exists(path):
+        return messages
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                request = json.loads(line)
+                messages.extend(request[key] for key in ("title", "body") if request.get(key))
+    return messages
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def replay(get_intent_response, messages, repeat: int = 1, reference=None) -> dict:
+    # reference is timed on the same messages in the same run, so latencies can be compared across machines
+    answers = {}
+    latencies = []
+    reference_latencies = []
+    elapsed = 0.0
+    for _ in range(repeat):
+        for message in messages:
+            if reference is not None:
+                t0 = time.perf_counter_ns()
+                reference(message)
+                reference_latencies.append(time.perf_counter_ns() - t0)
+            t0 = time.perf_counter_ns()
+            intent, _ = get_intent_response(message)
+            latencies.append(time.perf_counter_ns() - t0)
+            elapsed += latencies[-1] / 1e9
+            answers[message] = intent
+    hits = Counter(intent for intent in answers.values() if intent)
+    return {
+        "messages": len(messages),
+        "answers": answers,
+        "hits": dict(sorted(hits.items())),
+        "hit_rate": sum(hits.values()) / len(messages) if messages else 0.0,
+        "p50_us": percentile(latencies, 0.50) / 1000,
+        "p99_us": percentile(latencies, 0.99) / 1000,
+        "p99_ratio": percentile(latencies, 0.99) / max(1, percentile(reference_latencies, 0.99)),
+        "messages_per_second": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+def print_report(name: str, result: dict):
+    print(f"\n== {name}: {result['messages']} messages, hit rate {result['hit_rate']:.1%}")
+    print(f"   p50 {result['p50_us']:.2f} us  p99 {result['p99_us']:.2f} us ({result['p99_ratio']:.1f}x normalizing)  "
+          f"{result['messages_per_second']:,.0f} messages/s")
+    for intent, count in result["hits"].items():
+        print(f"   {intent:<20} {count:>6}  {count / result['messages']:.1%}")
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float | None = None) -> list:
+    failures = []
+    for name, result in results.items():
+        expected = baseline.get(name) if name in BASELINE_CORPORA else None
+        if expected is None:
+            continue
+        if "answers" in expected:
+            for message, intent in expected["answers"].items():
+                actual = result["answers"].get(message, intent)
+                if actual != intent:
+                    failures.append(f"{name}: {message[:60]!r} answered {actual} instead of {intent}")
+        if expected["hits"] != result["hits"]:
+            failures.append(f"{name}: intent hits changed from {expected['hits']} to {result['hits']}")
+        # Latency is only gated on request and relative to normalizing the same messages, absolute times vary by machine
+        if tolerance is not None and result["p99_ratio"] > expected["p99_ratio"] * tolerance:
+            failures.append(f"{name}: p99 is {result['p99_ratio']:.1f}x normalizing, over {tolerance}x the "
+                            f"baseline {expected['p99_ratio']:.1f}x")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded and synthetic chat through the help engine offline.")
+    parser.add_argument("--chatter", type=int, default=20000, help="number of synthetic non-matching messages")
+    parser.add_argument("--repeat", type=int, default=50, help="times to replay the small corpora")
+    parser.add_argument("--tolerance", type=float,
+                        help="also fail if p99, as a multiple of normalizing time, grows this many times")
+    parser.add_argument("--cached", action="store_true",
+                        help="keep the response cache on (off by default so repeats measure the full chain)")
+    parser.add_argument("--no-prefilter", action="store_true", help="send every message through the full chain")
+    parser.add_argument("--update-baseline", action="store_true", help="save this run as the new baseline")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)  # helpEngine loads its data files relative to the working directory
+    import helpEngine
+    helpEngine.ensure_loaded()
+    helpEngine.get_fallback_classifier()  # keep the one-off loads out of the latencies
+    if not args.cached:
+        helpEngine.response_cache.capacity = 0
+
+    corpora = {
+        "questions": (load_questions(), args.repeat),
+        "requests": (load_requests(), args.repeat),  # local only, never saved to the baseline
+        "chatter": (make_chatter(args.chatter), 1),
+    }
+    results = {}
+    filtered = {name: Counter() for name in corpora}
+
+    def prefiltered_response(name):
+        # What on_message does: messages the prefilter rules out never reach the engine
+        def respond(message):
+            tier = helpEngine.prefilter_tier(message)
+            if tier is None:
+                return helpEngine.get_intent_response(message)
+            filtered[name][tier] += 1
+            return None, None
+        return respond
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for name, (messages, repeat) in corpora.items():
+            if messages:
+                respond = helpEngine.get_intent_response if args.no_prefilter else prefiltered_response(name)
+                results[name] = replay(respond, messages, repeat, reference=helpEngine.response_cache.normalize)
+    for name, result in results.items():
+        print_report(name, result)
+        if filtered[name]:
+            print("   prefiltered: " + ", ".join(f"{tier} {count}" for tier, count in filtered[name].most_common()))
+
+    if args.update_baseline:
+        baseline = {}
+        for name in BASELINE_CORPORA:
+            result = results[name]
+            baseline[name] = {"hits": result["hits"], "p99_ratio": round(result["p99_ratio"], 2)}
+            if name == "questions":  # chatter is regenerated from a fixed seed, its hit counts are enough
+                baseline[name]["answers"] = result["answers"]
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+        print(f"\nSaved baseline to {BASELINE_FILE}")
+        return 0
+
+    if not os.path.exists(BASELINE_FILE):
+        print("\nNo baseline yet, run with --update-baseline to create one")
+        return 0
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        failures = compare_to_baseline(results, json.load(f), args.tolerance)
+    if failures:
+        print("\nRegressions against the baseline:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
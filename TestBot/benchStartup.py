@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+TESTBOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTBOT_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, TESTBOT_DIR)
+
+FIRST_CHANNEL_ID = 800000000000000000
+QUESTION = "What are the Town Center requirements for level 25?"
+
+
+def engine_child() -> dict:
+    # Time from a bare interpreter to the first answer, without discord's gateway
+    start = time.perf_counter()
+    import helpEngine
+    imported = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        intent, _ = helpEngine.get_intent_response(QUESTION)
+    answered = time.perf_counter()
+    assert intent is not None, QUESTION
+    return {"import": imported - start, **helpEngine.startup_times, "first answer": answered - start}
+
+
+async def bot_child() -> dict:
+    # Time from importing helpBot to its first reply reaching the fake REST API
+    import discord
+    import yarl
+    from fakeDiscord import FakeDiscord
+    from loadDriver import wait_for
+
+    fake = FakeDiscord([FIRST_CHANNEL_ID], latency=0.0, jitter=0.0, rate_limit_chance=0.0).start()
+    discord.http.Route.BASE = f"{fake.base_url}/api/v10"
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"ws://127.0.0.1:{fake.port}/gateway")
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        import helpBot
+        helpBot.set_allowed_channel_ids({FIRST_CHANNEL_ID})
+        bot_task = asyncio.create_task(helpBot.bot.start("fake-token"))
+        try:
+            if not await wait_for(helpBot.bot.is_ready, timeout=15):
+                raise RuntimeError("bot never became ready against the fake gateway")
+            await asyncio.wrap_future(fake.run_coroutine(fake.inject_message(FIRST_CHANNEL_ID, QUESTION, True)))
+            if not await wait_for(lambda: "first answer" in helpBot.startup_times, timeout=15, poll=0.001):
+                raise RuntimeError("the first question was never answered")
+        finally:
+            await helpBot.bot.close()
+            with contextlib.suppress(Exception):
+                await bot_task
+            fake.stop()
+    return {**helpBot.startup_times, **helpBot.helpEngine.startup_times}
+
+
+def run_child(mode: str) -> tuple[float, dict]:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, __file__, "--child", mode], cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{mode} run failed:\n{result.stderr}")
+    return elapsed, json.loads(result.stdout.splitlines()[-1])
+
+
+def summarize(label: str, runs):
+    # Median of every phase across runs, in the order the phases first appeared
+    phases = {}
+    for _, timings in runs:
+        for name, seconds in timings.items():
+            phases.setdefault(name, []).append(seconds)
+    process = statistics.median(elapsed for elapsed, _ in runs)
+    print(f"{label} ({len(runs)} runs, median): process {process * 1000:.0f} ms")
+    print("  " + ", ".join(f"{name} {statistics.median(values) * 1000:.1f} ms" for name, values in phases.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold and warm startup of the help engine and the bot.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per measurement")
+    parser.add_argument("--child", choices=("engine", "bot"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        os.chdir(ROOT)  # helpEngine loads its data files relative to the working directory
+        result = engine_child() if args.child == "engine" else asyncio.run(bot_child())
+        print(json.dumps(result))
+        return
+
+    import helpEngine
+    snapshot = os.path.join(ROOT, helpEngine.SNAPSHOT_FILE)
+    cold = []
+    for _ in range(args.runs):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(snapshot)
+        cold.append(run_child("engine"))
+    summarize("Engine, cold (no snapshot)", cold)
+    summarize("Engine, warm (snapshot)", [run_child("engine") for _ in range(args.runs)])
+    summarize("Bot against fakeDiscord, warm", [run_child("bot") for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
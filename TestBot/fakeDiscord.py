@@ -0,0 +1,272 @@
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+
+from aiohttp import WSMsgType, web
+
+BOT_USER_ID = 900000000000000001
+GUILD_ID = 900000000000000002
+USER_ID = 900000000000000003
+
+
+def snowflake_time() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def json_response(data, status: int = 200, headers=None):
+    # discord.py only decodes bodies whose content-type is exactly application/json
+    return web.Response(body=json.dumps(data).encode(), status=status,
+                        headers={"Content-Type": "application/json", **(headers or {})})
+
+
+class FakeDiscord:
+    """Local stand-in for the Discord gateway and REST API.
+
+    Serves just enough of both for discord.py to log in, connect and run a
+    bot: a websocket gateway that dispatches injected MESSAGE_CREATE events
+    and REST routes for sending messages, uploading attachments (served
+    back from signed, expiring /attachments URLs like Discord's CDN) and
+    adding reactions. Every REST
+    call is recorded, answered after a simulated latency, and a share of
+    message sends gets a 429 with a retry_after.
+
+    The server runs its own event loop in a background thread so the bot
+    under test gets its event loop to itself.
+    """
+
+    def __init__(self, channel_ids, latency: float = 0.05, jitter: float = 0.02,
+                 rate_limit_chance: float = 0.0, retry_after: float = 0.25, seed: int = 0,
+                 attachment_ttl: float = 86400.0):
+        self.channel_ids = list(channel_ids)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_chance = rate_limit_chance
+        self.retry_after = retry_after
+        self.attachment_ttl = attachment_ttl
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.rate_limited = 0
+        self.reply_latencies = []
+        self.replied_embeds = 0
+        self.injected = 0
+        self.attachments = {}  # path -> bytes of every uploaded file
+        self.port = None
+        self.loop = None
+        self._ids = itertools.count(1000000000000000000)
+        self._pending = {channel_id: deque() for channel_id in self.channel_ids}
+        self._sockets = {}  # socket -> True when it identified as the shard holding the guild
+        self._sequence = itertools.count(1)
+        self._ready = threading.Event()
+        self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    # Lifecycle
+
+    def start(self):
+        thread = threading.Thread(target=self._run_thread, name="fake-discord", daemon=True)
+        thread.start()
+        self._ready.wait()
+        return self
+
+    def _run_thread(self):
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self._start_server())
+        self._ready.set()
+        self.loop.run_forever()
+
+    async def _start_server(self):
+        app = web.Application()
+        app.router.add_get("/gateway", self.gateway)
+        app.router.add_get("/api/v10/users/@me", self.get_me)
+        app.router.add_get("/api/v10/oauth2/applications/@me", self.get_application)
+        app.router.add_post("/api/v10/channels/{channel_id}/messages", self.post_message)
+        app.router.add_post("/api/v10/channels/{channel_id}/typing", self.post_typing)
+        app.router.add_put("/api/v10/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self.put_reaction)
+        app.router.add_get("/attachments/{channel_id}/{attachment_id}/{filename}", self.get_attachment)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        async def shutdown():
+            for socket in list(self._sockets):
+                await socket.close()
+            await self._runner.cleanup()
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def run_coroutine(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    # Payloads
+
+    def user_payload(self, user_id: int, bot: bool) -> dict:
+        return {"id": str(user_id), "username": "helpbot" if bot else f"user{user_id % 1000}",
+                "discriminator": "0", "avatar": None, "bot": bot, "global_name": None}
+
+    def guild_payload(self) -> dict:
+        return {
+            "id": str(GUILD_ID), "name": "Load Test", "owner_id": str(USER_ID), "member_count": 2,
+            "roles": [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "8", "position": 0,
+                       "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [{"id": str(channel_id), "type": 0, "name": f"load-{i}", "position": i,
+                          "permission_overwrites": [], "guild_id": str(GUILD_ID)}
+                         for i, channel_id in enumerate(self.channel_ids)],
+            "members": [], "emojis": [], "stickers": [], "features": [], "threads": [],
+            "voice_states": [], "presences": [], "stage_instances": [], "guild_scheduled_events": [],
+            "unavailable": False, "large": False,
+        }
+
+    def message_payload(self, channel_id: int, author: dict, content: str = "", embeds=(), attachments=()) -> dict:
+        return {
+            "id": str(next(self._ids)), "channel_id": str(channel_id), "guild_id": str(GUILD_ID),
+            "author": author, "content": content, "timestamp": snowflake_time(), "edited_timestamp": None,
+            "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+            "attachments": list(attachments),
+            "embeds": list(embeds), "pinned": False, "type": 0,
+        }
+
+    # Gateway
+
+    async def gateway(self, request):
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        self._sockets[socket] = False
+        await socket.send_json({"op": 10, "d": {"heartbeat_interval": 41250}})
+        try:
+            async for msg in socket:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                if payload["op"] == 1:  # Heartbeat
+                    await socket.send_json({"op": 11})
+                elif payload["op"] == 2:  # Identify
+                    shard_id, shard_count = payload["d"].get("shard") or [0, 1]
+                    # Like Discord, a guild lives on shard (guild_id >> 22) % shard_count
+                    self._sockets[socket] = (GUILD_ID >> 22) % shard_count == shard_id
+                    guilds = [self.guild_payload()] if self._sockets[socket] else []
+                    await self._dispatch(socket, "READY", {
+                        "v": 10, "user": self.user_payload(BOT_USER_ID, bot=True), "guilds": guilds,
+                        "session_id": f"fake-session-{shard_id}", "resume_gateway_url": f"ws://127.0.0.1:{self.port}/gateway",
+                        "application": {"id": str(BOT_USER_ID), "flags": 0}, "shard": [shard_id, shard_count],
+                    })
+        finally:
+            self._sockets.pop(socket, None)
+        return socket
+
+    async def _dispatch(self, socket, event: str, data: dict):
+        await socket.send_json({"op": 0, "t": event, "s": next(self._sequence), "d": data})
+
+    async def inject_message(self, channel_id: int, content: str, expects_reply: bool):
+        # Runs on the fake server's loop; the timestamp is what reply latency is measured from
+        payload = self.message_payload(channel_id, self.user_payload(USER_ID, bot=False), content)
+        if expects_reply:
+            self._pending[channel_id].append(time.monotonic())
+        self.injected += 1
+        for socket, has_guild in list(self._sockets.items()):
+            if has_guild:
+                await self._dispatch(socket, "MESSAGE_CREATE", payload)
+
+    @property
+    def connected(self) -> bool:
+        return bool(self._sockets)
+
+    @property
+    def awaiting_replies(self) -> int:
+        return sum(len(pending) for pending in self._pending.values())
+
+    # REST
+
+    async def _respond(self, route: str):
+        self.calls[route] += 1
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+    def _rate_limit(self):
+        self.rate_limited += 1
+        return json_response(
+            {"message": "You are being rate limited.", "retry_after": self.retry_after, "global": False},
+            status=429,
+            headers={"Retry-After": str(self.retry_after), "X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "0",
+                     "X-RateLimit-Reset-After": str(self.retry_after), "X-RateLimit-Bucket": "fake-bucket",
+                     "X-RateLimit-Scope": "user",
+                     "Via": "1.1 google"},  # discord.py treats a 429 without Via as a Cloudflare ban
+        )
+
+    async def get_me(self, request):
+        await self._respond("GET /users/@me")
+        return json_response(self.user_payload(BOT_USER_ID, bot=True))
+
+    async def get_application(self, request):
+        await self._respond("GET /oauth2/applications/@me")
+        return json_response({
+            "id": str(BOT_USER_ID), "name": "helpbot", "description": "", "icon": None, "bot_public": False,
+            "bot_require_code_grant": False, "owner": self.user_payload(USER_ID, bot=False), "verify_key": "",
+            "flags": 0, "summary": "",
+        })
+
+    async def read_upload(self, request, channel_id: int):
+        # Messages with files arrive as multipart: a payload_json part plus one part per file
+        body, attachments = {}, []
+        async for part in await request.multipart():
+            if part.name == "payload_json":
+                body = json.loads(await part.text())
+                continue
+            data = await part.read()
+            attachment_id = next(self._ids)
+            path = f"/attachments/{channel_id}/{attachment_id}/{part.filename}"
+            self.attachments[path] = data
+            expires = int(time.time() + self.attachment_ttl)
+            attachments.append({
+                "id": str(attachment_id), "filename": part.filename, "size": len(data),
+                "url": f"{self.base_url}{path}?ex={expires:x}&is={int(time.time()):x}&hm=fake",
+                "proxy_url": f"{self.base_url}{path}", "content_type": part.headers.get("Content-Type"),
+            })
+        return body, attachments
+
+    async def post_message(self, request):
+        channel_id = int(request.match_info["channel_id"])
+        if request.content_type.startswith("multipart/"):
+            body, attachments = await self.read_upload(request, channel_id)
+            await self._respond("POST /channels/messages (upload)")
+            return json_response(self.message_payload(channel_id, self.user_payload(BOT_USER_ID, bot=True),
+                                                      body.get("content") or "", body.get("embeds") or [], attachments))
+        body = await request.json()
+        await self._respond("POST /channels/messages")
+        if self.random.random() < self.rate_limit_chance:
+            return self._rate_limit()
+        embeds = body.get("embeds") or []
+        now = time.monotonic()
+        pending = self._pending.get(channel_id)
+        for _ in embeds:
+            if pending:
+                self.reply_latencies.append(now - pending.popleft())
+        self.replied_embeds += len(embeds)
+        return json_response(self.message_payload(channel_id, self.user_payload(BOT_USER_ID, bot=True), body.get("content") or "", embeds))
+
+    async def post_typing(self, request):
+        await self._respond("POST /channels/typing")
+        return web.Response(status=204)
+
+    async def put_reaction(self, request):
+        await self._respond("PUT /channels/messages/reactions")
+        return web.Response(status=204)
+
+    async def get_attachment(self, request):
+        data = self.attachments.get(request.path)
+        if data is None:
+            return web.Response(status=404)
+        expires = request.query.get("ex")
+        if expires is not None and int(expires, 16) < time.time():
+            return web.Response(status=404)  # the signed link has expired
+        await self._respond("GET /attachments")
+        return web.Response(body=data)
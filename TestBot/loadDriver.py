@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import random
+import sys
+import time
+
+TESTBOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTBOT_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, TESTBOT_DIR)
+
+import discord
+import yarl
+
+from benchMatcher import make_chatter
+from benchReplay import load_questions, percentile
+from fakeDiscord import FakeDiscord
+
+FIRST_CHANNEL_ID = 800000000000000000
+
+
+async def generate_load(fake: FakeDiscord, channel_ids, rate: float, duration: float, corpus, seed: int):
+    # Runs on the fake server's loop: every channel posts `rate` messages per second on a fixed schedule
+    async def channel_load(channel_id: int, rng: random.Random):
+        interval = 1.0 / rate
+        start = time.monotonic() + rng.uniform(0, interval)
+        sent = 0
+        while True:
+            due = start + sent * interval
+            if due - start >= duration:
+                return
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+            content, expects_reply = rng.choice(corpus)
+            await fake.inject_message(channel_id, content, expects_reply)
+            sent += 1
+
+    await asyncio.gather(*(channel_load(channel_id, random.Random(seed + i)) for i, channel_id in enumerate(channel_ids)))
+
+
+async def monitor_loop_lag(samples: list, interval: float = 0.05):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def wait_for(condition, timeout: float, poll: float = 0.05) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(poll)
+    return True
+
+
+def format_ms(samples) -> str:
+    return "  ".join(f"p{int(q * 100)} {percentile(samples, q) * 1000:.1f} ms" for q in (0.5, 0.9, 0.99)) + \
+        f"  max {max(samples, default=0) * 1000:.1f} ms"
+
+
+async def run(args) -> int:
+    os.chdir(ROOT)  # helpBot loads its data files relative to the working directory
+    import helpBot
+    import helpEngine
+
+    channel_ids = [FIRST_CHANNEL_ID + i for i in range(args.channels)]
+    fake = FakeDiscord(channel_ids, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                       rate_limit_chance=args.rate_limit_chance, retry_after=args.retry_after, seed=args.seed).start()
+    discord.http.Route.BASE = f"{fake.base_url}/api/v10"
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"ws://127.0.0.1:{fake.port}/gateway")
+    helpBot.set_allowed_channel_ids(set(channel_ids))
+    helpBot.recent_answers.window = args.repeat_window
+
+    # Label the corpus up front so the fake knows which messages should get an answer
+    questions = load_questions()
+    chatter = make_chatter(max(1, len(questions) * 10), seed=args.seed)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        corpus = [(message, helpEngine.get_embed_response(message) is not None) for message in questions]
+        corpus += [(message, helpEngine.get_embed_response(message) is not None) for message in chatter]
+    weights = [(1 - args.chatter) / len(questions)] * len(questions) + [args.chatter / len(chatter)] * len(chatter)
+    rng = random.Random(args.seed)
+    corpus = rng.choices(corpus, weights=weights, k=10000)
+
+    handled = 0
+
+    async def count_message(message):
+        nonlocal handled
+        handled += 1
+
+    helpBot.bot.add_listener(count_message, "on_message")
+    lag_samples = []
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        bot_task = asyncio.create_task(helpBot.bot.start("fake-token"))
+        if not await wait_for(helpBot.bot.is_ready, timeout=15):
+            print("Bot never became ready against the fake gateway", file=sys.stderr)
+            return 1
+        lag_task = asyncio.create_task(monitor_loop_lag(lag_samples))
+
+        start = time.monotonic()
+        await asyncio.wrap_future(fake.run_coroutine(
+            generate_load(fake, channel_ids, args.rate, args.duration, corpus, args.seed)))
+        injected_at = time.monotonic()
+        drained = await wait_for(lambda: handled >= fake.injected and helpBot.outbound_queue.depth == 0
+                                 and fake.awaiting_replies == 0, timeout=args.drain_timeout)
+        elapsed = time.monotonic() - start
+
+        lag_task.cancel()
+        await helpBot.bot.close()
+        with contextlib.suppress(Exception):
+            await bot_task
+    fake.stop()
+
+    offered = args.channels * args.rate
+    print(f"Load: {args.channels} channels x {args.rate:g} msg/s = {offered:g} msg/s offered for {args.duration:g}s")
+    print(f"Injected {fake.injected} messages in {injected_at - start:.2f}s, bot handled {handled} "
+          f"({handled / elapsed:.1f} msg/s sustained over {elapsed:.2f}s)")
+    print(f"Replies: {fake.replied_embeds} embeds in {fake.calls['POST /channels/messages'] - fake.rate_limited} messages, "
+          f"{fake.rate_limited} rate limited (429) responses")
+    print(f"REST calls: {dict(fake.calls)}")
+    print(f"Reply latency: {format_ms(fake.reply_latencies)}")
+    print(f"Event loop lag: {format_ms(lag_samples)}")
+    if not drained:
+        print(f"Did not drain within {args.drain_timeout:g}s: outbound depth {helpBot.outbound_queue.depth}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the full on_message path against a local fake Discord.")
+    parser.add_argument("--channels", type=int, default=5, help="number of channels posting messages")
+    parser.add_argument("--rate", type=float, default=2.0, help="messages per second per channel")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--chatter", type=float, default=0.7, help="share of messages that aren't questions")
+    parser.add_argument("--latency", type=float, default=50.0, help="simulated REST latency in ms")
+    parser.add_argument("--jitter", type=float, default=20.0, help="random REST latency jitter in ms")
+    parser.add_argument("--rate-limit-chance", type=float, default=0.02, help="share of sends answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=0.25, help="retry_after seconds on a 429")
+    parser.add_argument("--repeat-window", type=float, default=0.0,
+                        help="seconds repeat questions are linked to the earlier answer (0 answers every question)")
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="seconds to wait for queued replies")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    logging.getLogger("discord").setLevel(logging.ERROR)  # 429 retries are counted in the report instead
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+
+TESTBOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTBOT_DIR)
+sys.path.insert(0, ROOT)
+
+from fallbackClassifier import THRESHOLD, FallbackClassifier, rule_examples
+from helpRules import RULES
+from responseCache import ResponseCache
+
+HELD_OUT_FILE = os.path.join(TESTBOT_DIR, "fallbackHeldOut.txt")
+QUESTIONS_FILE = os.path.join(TESTBOT_DIR, "questions.txt")
+COPY_SCORE = 0.9  # a question this close to an example was probably written from it
+
+
+def load_held_out(path=HELD_OUT_FILE):
+    # intent|message lines, "-" for chat the fallback must leave alone
+    with open(path, "r", encoding="utf-8") as f:
+        return [tuple(line.strip().split("|", 1)) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the fallback classifier's threshold over held-out phrasings.")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="threshold to list the misses for")
+    args = parser.parse_args()
+
+    normalize = ResponseCache().normalize
+    classifier = FallbackClassifier.fit(rule_examples(RULES), threshold=0.0)
+    scored = [(expected, message, *classifier.classify(normalize(message))) for expected, message in load_held_out()]
+    questions = sum(1 for expected, *_ in scored if expected != "-")
+
+    print(f"{len(scored)} held-out messages, {questions} questions, {len(scored) - questions} chat")
+    print(f"{'threshold':>9} {'right':>6} {'wrong':>6} {'precision':>9} {'recall':>7}")
+    for step in range(30, 71, 2):
+        threshold = step / 100
+        answered = [(expected, intent) for expected, _, intent, score in scored if intent and score >= threshold]
+        right = sum(1 for expected, intent in answered if expected == intent)
+        precision = right / len(answered) if answered else 1.0
+        print(f"{threshold:>9.2f} {right:>6} {len(answered) - right:>6} {precision:>9.0%} {right / questions:>7.0%}")
+
+    print(f"\nMisses at {args.threshold}:")
+    for expected, message, intent, score in scored:
+        answer = intent if intent and score >= args.threshold else "-"
+        if answer != expected:
+            print(f"  {score:.2f} {answer:<20} expected {expected:<20} {message}")
+
+    # The examples must not be lifted from the replay corpus, or benchReplay measures memorization
+    with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            intent, score = classifier.classify(normalize(line.strip()))
+            if score >= COPY_SCORE:
+                print(f"questions.txt line is a near-copy of a {intent} example ({score:.2f}): {line.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from urllib.parse import parse_qs, urlsplit
+
+import discord
+
+import metrics
+
+log = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+
+def url_expiry(url: str) -> float | None:
+    # Discord signs attachment URLs and puts the expiry in ex, as hex Unix seconds
+    ex = parse_qs(urlsplit(url).query).get("ex")
+    try:
+        return float(int(ex[0], 16)) if ex else None
+    except ValueError:
+        return None
+
+
+class AssetCache:
+    """Response images kept in a local directory and uploaded to Discord once.
+
+    Images are keyed by the sha256 of their bytes. An image without a stored
+    URL is posted once as an attachment to the asset channel, and the CDN URL
+    Discord returns is saved in SQLite under that hash. Later replies, and
+    later runs, reuse that URL: nothing is uploaded again and no third-party
+    host is fetched. Identical files share one upload. An edited file gets a
+    new hash and is uploaded again. Discord's attachment URLs expire, so URLs
+    within refresh_margin seconds of their expiry are uploaded again.
+
+    url() only reads memory. scan() hashes the directory, and sync() uploads
+    whatever is missing.
+    """
+
+    def __init__(self, directory: str = "assets", path: str = "assets.db", refresh_margin: float = 6 * 3600):
+        self.directory = directory
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self._hashes = {}  # file name -> sha256
+        self._urls = {}  # sha256 -> (url, expires_at), as of the last scan
+        self._files = {}  # file name -> (mtime_ns, size, sha256), so unchanged files aren't rehashed
+        self._task = None
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS assets ("
+            "sha256 TEXT PRIMARY KEY, filename TEXT NOT NULL, url TEXT NOT NULL, "
+            "expires_at REAL, uploaded_at REAL NOT NULL)"
+        )
+        return connection
+
+    def _load(self):
+        with closing(self._connect()) as connection, connection:
+            rows = connection.execute("SELECT sha256, url, expires_at FROM assets").fetchall()
+        self._urls = {sha256: (url, expires_at) for sha256, url, expires_at in rows}
+
+    def scan(self) -> dict:
+        """Hash the images in the directory; returns file name -> sha256."""
+        self._load()  # also picks up uploads made by other workers sharing the database
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.lower().endswith(IMAGE_EXTENSIONS))
+        except FileNotFoundError:
+            names = []
+        files = {}
+        for name in names:
+            stat = os.stat(os.path.join(self.directory, name))
+            known = self._files.get(name)
+            if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                files[name] = known
+                continue
+            with open(os.path.join(self.directory, name), "rb") as f:
+                files[name] = (stat.st_mtime_ns, stat.st_size, hashlib.sha256(f.read()).hexdigest())
+        self._files = files
+        self._hashes = {name: sha256 for name, (_, _, sha256) in files.items()}
+        return dict(self._hashes)
+
+    def url(self, name: str, fallback: str | None = None) -> str | None:
+        """The CDN URL of an uploaded image, or fallback if it has none yet."""
+        entry = self._urls.get(self._hashes.get(name))
+        if entry is None:
+            return fallback
+        url, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            return fallback
+        return url
+
+    def stale(self, now: float | None = None) -> dict:
+        # Images with no URL or one that expires within the refresh margin, as file name -> sha256
+        now = time.time() if now is None else now
+        stale, seen = {}, set()
+        for name, sha256 in self._hashes.items():
+            entry = self._urls.get(sha256)
+            if sha256 not in seen and (entry is None or (entry[1] is not None and entry[1] - self.refresh_margin <= now)):
+                stale[name] = sha256
+            seen.add(sha256)
+        return stale
+
+    def _save(self, sha256: str, filename: str, url: str, expires_at: float | None):
+        with closing(self._connect()) as connection, connection:
+            connection.execute("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?)",
+                               (sha256, filename, url, expires_at, time.time()))
+
+    async def sync(self, channel: discord.abc.Messageable) -> int:
+        """Upload the images without a usable URL to channel; returns how many were uploaded."""
+        await asyncio.to_thread(self.scan)
+        uploaded = 0
+        for name, sha256 in self.stale().items():
+            message = await channel.send(file=discord.File(os.path.join(self.directory, name), filename=name))
+            if not message.attachments:
+                log.warning("Uploading asset %s returned no attachment", name)
+                continue
+            url = message.attachments[0].url
+            expires_at = url_expiry(url)
+            await asyncio.to_thread(self._save, sha256, name, url, expires_at)
+            self._urls[sha256] = (url, expires_at)
+            metrics.asset_uploads.inc()
+            uploaded += 1
+        return uploaded
+
+    async def sync_periodically(self, channel: discord.abc.Messageable, interval: float, on_change=None):
+        while True:
+            try:
+                if await self.sync(channel) and on_change is not None:
+                    on_change()
+            except (OSError, sqlite3.Error, discord.HTTPException):
+                log.exception("Uploading response images failed, will retry")
+            await asyncio.sleep(interval)
+
+    def start(self, channel: discord.abc.Messageable, interval: float = 3600.0, on_change=None):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.sync_periodically(channel, interval, on_change))
+        return self._task
@@ -0,0 +1,80 @@
+import contextlib
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def describe_sources(paths) -> dict:
+    sources = {}
+    for path in paths:
+        stat = os.stat(path)
+        sources[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_hash(path)}
+    return sources
+
+
+def sources_match(recorded: dict, paths) -> bool:
+    # mtime and size decide on the fast path; a touched but unchanged file is confirmed by its hash
+    if set(recorded) != set(paths):
+        return False
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        expected = recorded[path]
+        if stat.st_mtime_ns == expected["mtime_ns"] and stat.st_size == expected["size"]:
+            continue
+        if stat.st_size != expected["size"] or file_hash(path) != expected["sha256"]:
+            return False
+    return True
+
+
+def load_snapshot(path: str, sources):
+    """Parsed data saved by save_snapshot, or None if missing or out of date.
+
+    The file holds a small header (version and the mtime, size and sha256 of
+    every source file) followed by the data, so a stale snapshot is rejected
+    without unpickling the data. Snapshots are only ever written by this
+    process's own save_snapshot; never point this at a file from elsewhere.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = pickle.load(f)
+            if header.get("version") != SNAPSHOT_VERSION or not sources_match(header.get("sources", {}), sources):
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log.exception("Ignoring unreadable snapshot %s", path)
+        return None
+
+
+def save_snapshot(path: str, sources: dict, data):
+    # sources comes from describe_sources() taken before parsing, so an edit made meanwhile invalidates it
+    header = {"version": SNAPSHOT_VERSION, "sources": sources}
+    tmp_path = None
+    try:
+        # A temporary file of its own, so worker processes saving at the same time never share one
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+                                        dir=os.path.dirname(path) or ".")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        log.exception("Could not save the data snapshot to %s", path)
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
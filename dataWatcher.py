@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import os
+import time
+
+log = logging.getLogger(__name__)
+
+
+class DataFileWatcher:
+    """Polls data files and reparses only the ones that changed.
+
+    Each file has a loader (path -> parsed data) and an apply callback that
+    swaps the result in. Loaders run in a worker thread; apply runs on the
+    event loop in one step, so message handlers see either the old or the new
+    data, never a half-loaded table. If a loader raises, the last good data
+    stays in place.
+
+    A changed file is only reloaded once its mtime and size have stayed the
+    same for one more poll, so a file still being written (or cut off at a
+    line boundary mid-save) isn't picked up. Files that are replaced
+    atomically, like SQLite databases, can skip that wait with settle=False.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._files = {}
+        self._task = None
+
+    def watch(self, path: str, loader, apply, settle: bool = True):
+        self._files[path] = {"loader": loader, "apply": apply, "settle": settle, "signature": self._signature(path),
+                             "pending": None}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @staticmethod
+    def _signature(path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def reload(self, path: str) -> bool:
+        entry = self._files[path]
+        start = time.perf_counter()
+        try:
+            data = await asyncio.to_thread(entry["loader"], path)
+        except Exception:
+            log.exception("Reloading %s failed, keeping the last good data", path)
+            return False
+        entry["apply"](data)
+        print(f"🔄 Reloaded {path} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return True
+
+    async def check(self):
+        for path, entry in self._files.items():
+            signature = self._signature(path)
+            if signature is None or signature == entry["signature"]:
+                entry["pending"] = None
+                continue
+            if entry["settle"] and signature != entry["pending"]:
+                entry["pending"] = signature  # changed since the last poll, wait for it to settle
+                continue
+            # Remember the signature even on failure so a broken file isn't reparsed every tick
+            entry["signature"] = signature
+            entry["pending"] = None
+            await self.reload(path)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
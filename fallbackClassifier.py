@@ -0,0 +1,171 @@
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+from collections import Counter
+from itertools import repeat
+
+import numpy as np
+
+from ruleEngine import keyword_probe
+
+log = logging.getLogger(__name__)
+
+NGRAM_SIZES = (3, 4, 5)
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+MIN_LENGTH = 10  # Shorter messages carry too few n-grams to classify reliably
+MAX_LENGTH = 200  # Longer messages are never close enough to a one-line question to clear the threshold
+MIN_SHARED_WORDS = 2  # One word in common with the examples is chat that mentions the game, not a question about it
+THRESHOLD = 0.42  # Picked with TestBot/tuneFallback.py on phrasings the examples were not written from
+STEM_LENGTH = 4  # Words are compared by their first letters so "heroes" and "dayz" still count
+# Function words and filler carry no intent; left in, "what should i do now" scores like a question about gems
+STOP_WORDS = frozenset("""
+a about all also an and any anybody anyone are as at be been best better can could did do does doing done
+for from get gets getting go going good got has have hey hi how i if in into is it its just know knows let
+like many me more most much my need no not now of on one or our out please pls so some someone somebody still tell than
+thanks that the their them then there these they this those to u up us was way we were what when where which
+who why will with would yes you your
+""".split())
+
+
+def char_ngrams(text: str) -> dict:
+    """Counts of character n-grams over the content words of text, padded with spaces."""
+    padded = " " + " ".join(content_words(text)) + " "
+    return Counter([padded[i:i + size] for size in NGRAM_SIZES for i in range(len(padded) - size + 1)])
+
+
+def content_words(text: str) -> list:
+    return [word for word in WORD_PATTERN.findall(text.casefold()) if word not in STOP_WORDS]
+
+
+def rule_examples(rules) -> list:
+    return [(rule["intent"], example) for rule in rules for example in rule.get("examples", ())]
+
+
+def fingerprint(examples, threshold: float) -> str:
+    payload = json.dumps({"examples": examples, "ngrams": NGRAM_SIZES, "threshold": threshold,
+                          "stop_words": sorted(STOP_WORDS), "stem": STEM_LENGTH})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FallbackClassifier:
+    """Character n-gram TF-IDF nearest-example classifier.
+
+    Each canonical question is an L2-normalised TF-IDF vector, stored
+    vocabulary-major (one row per n-gram, one column per example) so the rows
+    for the n-grams a message contains are a cheap gather. A message is
+    vectorised over the same vocabulary and scored against every example with
+    one vector-matrix product; the best example's intent wins if its cosine
+    similarity clears the threshold. Stop words are dropped first, and a
+    message sharing fewer than MIN_SHARED_WORDS word stems with the examples
+    is rejected before any n-gram is built, which keeps ordinary chat cheap.
+    """
+
+    def __init__(self, vocabulary: dict, idf, matrix, intents, threshold: float, stems):
+        self.vocabulary = vocabulary
+        self.stems = frozenset(stems)
+        # Stems only match at the start of a word, and words shorter than a stem ("ke", "gen") only as a whole word
+        long = [stem for stem in self.stems if len(stem) == STEM_LENGTH]
+        short = [stem for stem in self.stems if len(stem) < STEM_LENGTH]
+        branches = [keyword_probe(long).pattern] if long else []
+        if short:
+            branches.append(f"(?:{keyword_probe(short).pattern})\\b")
+        self._stem_probe = re.compile(rf"\b(?:{'|'.join(branches)})") if branches else None
+        self.idf = idf
+        self.matrix = matrix
+        self.intents = list(intents)
+        self.threshold = threshold
+        self.unseen_idf = float(idf.max()) if len(idf) else 1.0
+
+    @classmethod
+    def fit(cls, examples, threshold: float = THRESHOLD):
+        documents = [char_ngrams(text) for _, text in examples]
+        vocabulary = {}
+        for counts in documents:
+            for gram in counts:
+                vocabulary.setdefault(gram, len(vocabulary))
+
+        document_frequency = np.zeros(len(vocabulary))
+        for counts in documents:
+            document_frequency[[vocabulary[gram] for gram in counts]] += 1
+        idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+
+        matrix = np.zeros((len(vocabulary), len(documents)), dtype=np.float32)
+        for column, counts in enumerate(documents):
+            for gram, count in counts.items():
+                matrix[vocabulary[gram], column] = (1 + math.log(count)) * idf[vocabulary[gram]]
+        norms = np.linalg.norm(matrix, axis=0, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+        stems = {word[:STEM_LENGTH] for _, text in examples for word in content_words(text)}
+        return cls(vocabulary, idf.astype(np.float32), matrix, [intent for intent, _ in examples], threshold, stems)
+
+    def shares_words(self, content: str) -> bool:
+        if self._stem_probe is None:
+            return False
+        return len(set(self._stem_probe.findall(content.casefold()))) >= MIN_SHARED_WORDS
+
+    def classify(self, content: str) -> tuple[str | None, float]:
+        if not MIN_LENGTH <= len(content) <= MAX_LENGTH:
+            return None, 0.0
+        if not self.shares_words(content):
+            return None, 0.0
+        counts = char_ngrams(content)
+        rows = np.fromiter(map(self.vocabulary.get, counts, repeat(-1)), dtype=np.intp, count=len(counts))
+        tf = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        known = rows >= 0
+        if not known.any():
+            return None, 0.0
+        rows = rows[known]
+        weights = tf[known] * self.idf[rows]
+        unseen = tf[~known]
+        # n-grams outside the vocabulary get the highest idf and still count towards the message's norm
+        norm = math.sqrt(float(weights @ weights) + float(unseen @ unseen) * self.unseen_idf ** 2)
+        scores = weights @ self.matrix[rows] / norm
+        best = int(scores.argmax())
+        score = float(scores[best])
+        return (self.intents[best] if score >= self.threshold else None), score
+
+    def save(self, path: str, key: str):
+        vocabulary = np.array(sorted(self.vocabulary, key=self.vocabulary.get))
+        # Written to a temporary file of its own and renamed, so workers fitting at the same time can't collide
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+                                        dir=os.path.dirname(path) or ".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, key=np.array(key), vocabulary=vocabulary, idf=self.idf, matrix=self.matrix,
+                         intents=np.array(self.intents), threshold=np.array(self.threshold),
+                         stems=np.array(sorted(self.stems)))
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, key: str):
+        with np.load(path) as data:
+            if str(data["key"]) != key:
+                raise ValueError(f"{path} was built from different examples")
+            vocabulary = {str(gram): i for i, gram in enumerate(data["vocabulary"])}
+            return cls(vocabulary, data["idf"], data["matrix"], [str(intent) for intent in data["intents"]],
+                       float(data["threshold"]), [str(stem) for stem in data["stems"]])
+
+
+def load_or_fit(rules, path: str = "fallbackIndex.npz", threshold: float = THRESHOLD) -> FallbackClassifier:
+    """Load the cached index if it matches the rule examples, otherwise fit and cache it."""
+    examples = rule_examples(rules)
+    key = fingerprint(examples, threshold)
+    try:
+        return FallbackClassifier.load(path, key)
+    except (OSError, ValueError, KeyError) as e:
+        log.info("Rebuilding fallback index (%s)", e)
+    classifier = FallbackClassifier.fit(examples, threshold)
+    try:
+        classifier.save(path, key)
+    except OSError:
+        log.exception("Could not cache the fallback index to %s", path)
+    return classifier
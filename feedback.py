@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+log = logging.getLogger(__name__)
+
+VOTES = {"👍": "up", "👎": "down"}
+
+
+class FeedbackStore:
+    """👍/👎 votes on answers, aggregated per intent.
+
+    Sent answers are remembered in a bounded LRU of message id -> intents so
+    a reaction can be traced back to the rules that produced the message.
+    A message that coalesced several answers can't tell which one a vote
+    was meant for, so the vote counts once for each of its intents.
+    Votes update the in-memory totals right away and are queued as rows that
+    a background task appends to SQLite in batches, so a reaction never
+    waits on disk I/O.
+    """
+
+    def __init__(self, path: str = "feedback.db", capacity: int = 10000):
+        self.path = path
+        self.capacity = capacity
+        self.totals = {}  # intent -> {"up": n, "down": n}
+        self._messages = OrderedDict()
+        self._pending = []
+        self._task = None
+        self._load()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS votes ("
+            "created_at REAL NOT NULL, message_id INTEGER NOT NULL, user_id INTEGER NOT NULL, "
+            "intent TEXT NOT NULL, vote TEXT NOT NULL, delta INTEGER NOT NULL)"
+        )
+        return connection
+
+    def _load(self):
+        with closing(self._connect()) as connection, connection:
+            rows = connection.execute("SELECT intent, vote, SUM(delta) FROM votes GROUP BY intent, vote").fetchall()
+        for intent, vote, count in rows:
+            self.totals.setdefault(intent, {"up": 0, "down": 0})[vote] = count
+
+    def remember(self, message_id: int, intents):
+        intents = tuple(intent for intent in intents if intent)
+        if not intents:
+            return
+        self._messages[message_id] = intents
+        if len(self._messages) > self.capacity:
+            self._messages.popitem(last=False)
+
+    def record(self, message_id: int, user_id: int, emoji: str, added: bool = True) -> bool:
+        vote = VOTES.get(emoji)
+        intents = self._messages.get(message_id)
+        if vote is None or intents is None:
+            return False
+        self._messages.move_to_end(message_id)
+        delta = 1 if added else -1
+        now = time.time()
+        for intent in intents:
+            counts = self.totals.setdefault(intent, {"up": 0, "down": 0})
+            counts[vote] += delta
+            self._pending.append((now, message_id, user_id, intent, vote, delta))
+        return True
+
+    def flush(self) -> int:
+        """Write the queued votes now; called at shutdown once the event loop has stopped."""
+        rows, self._pending = self._pending, []
+        if rows:
+            self._write(rows)
+        return len(rows)
+
+    async def flush_async(self):
+        # The batch is swapped out on the loop; only the SQLite write runs in the worker thread
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except sqlite3.Error:
+            log.exception("Saving %d feedback votes failed, will retry", len(rows))
+            self._pending = rows + self._pending
+
+    def _write(self, rows):
+        with closing(self._connect()) as connection, connection:
+            connection.executemany("INSERT INTO votes VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    async def flush_periodically(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush_async()
+
+    def start(self, interval: float = 10.0):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.flush_periodically(interval))
+        return self._task
+
+    def worst(self, limit: int = 10, min_votes: int = 1) -> list:
+        """Intents with the highest share of 👎, as (intent, up, down)."""
+        rated = [(intent, counts["up"], counts["down"]) for intent, counts in self.totals.items()
+                 if counts["up"] + counts["down"] >= min_votes]
+        rated.sort(key=lambda row: (row[2] / max(1, row[1] + row[2]), row[2]), reverse=True)
+        return rated[:limit]
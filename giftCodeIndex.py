@@ -0,0 +1,114 @@
+import asyncio
+import heapq
+import logging
+from dataclasses import dataclass
+from datetime import datetime, time, timezone
+
+log = logging.getLogger(__name__)
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y")
+EXPIRY_TIME = time(23, 59, tzinfo=timezone.utc)  # Codes expire at 23:59 UTC on their date
+MAX_TIMER_SLEEP = 3600  # Re-check at least hourly in case the system clock jumps
+
+
+@dataclass(frozen=True)
+class GiftCode:
+    code: str
+    expiration_text: str
+    expires_at: datetime | None  # None when the date couldn't be parsed, never evicted
+
+    def __str__(self) -> str:
+        return f"{self.code} (Expire {self.expiration_text} at 23:59 UTC)"
+
+
+def parse_expiration(text: str) -> datetime | None:
+    for date_format in DATE_FORMATS:
+        try:
+            day = datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+        return datetime.combine(day, EXPIRY_TIME)
+    return None
+
+
+def load_gift_codes_and_expiration(path="giftCodes.txt"):
+    gift_codes = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                parts = line.split()  # Split by whitespace to separate code and date
+                if len(parts) == 2:
+                    gift_code, expiration_text = parts
+                    expires_at = parse_expiration(expiration_text)
+                    if expires_at is None:
+                        log.warning("Gift code %s has an unrecognised expiry date %r", gift_code, expiration_text)
+                    gift_codes.append(GiftCode(gift_code, expiration_text, expires_at))
+    return gift_codes
+
+
+class GiftCodeIndex:
+    """Active gift codes with a heap of expiry times and a cached embed.
+
+    render(codes) builds the embed; it's only called when the set of active
+    codes changes (a reload or an eviction), so answering a question is a
+    plain attribute read. start() runs a timer that evicts each code at its
+    expiry time.
+    """
+
+    def __init__(self, render, codes=()):
+        self._render = render
+        self._changed = asyncio.Event()
+        self._task = None
+        self.replace(codes)
+
+    def replace(self, codes, now: datetime | None = None):
+        self._active = {gift_code.code: gift_code for gift_code in codes}
+        self._heap = [(gift_code.expires_at, gift_code.code) for gift_code in self._active.values() if gift_code.expires_at]
+        heapq.heapify(self._heap)
+        self.evict_expired(now, rebuild=False)
+        self.embed = self._render(self.codes)
+        self._changed.set()
+
+    @property
+    def codes(self) -> list:
+        return list(self._active.values())
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def next_expiry(self) -> datetime | None:
+        return self._heap[0][0] if self._heap else None
+
+    def evict_expired(self, now: datetime | None = None, rebuild: bool = True) -> list:
+        now = now or datetime.now(timezone.utc)
+        evicted = []
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, code = heapq.heappop(self._heap)
+            gift_code = self._active.get(code)
+            if gift_code is not None and gift_code.expires_at == expires_at:
+                del self._active[code]
+                evicted.append(gift_code)
+        if evicted:
+            print(f"⌛ Expired gift codes: {', '.join(gift_code.code for gift_code in evicted)}")
+            if rebuild:
+                self.embed = self._render(self.codes)
+        return evicted
+
+    async def run(self):
+        while True:
+            self._changed.clear()
+            self.evict_expired()
+            next_expiry = self.next_expiry()
+            timeout = MAX_TIMER_SLEEP
+            if next_expiry is not None:
+                timeout = min(timeout, max(0.0, (next_expiry - datetime.now(timezone.utc)).total_seconds()))
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
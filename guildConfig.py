@@ -0,0 +1,164 @@
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+
+from giftCodeIndex import GiftCode, GiftCodeIndex, parse_expiration
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS guild_channels (guild_id INTEGER NOT NULL, channel_id INTEGER NOT NULL, "
+    "PRIMARY KEY (guild_id, channel_id))",
+    "CREATE TABLE IF NOT EXISTS guild_intents (guild_id INTEGER NOT NULL, intent TEXT NOT NULL, "
+    "enabled INTEGER NOT NULL, PRIMARY KEY (guild_id, intent))",
+    "CREATE TABLE IF NOT EXISTS guild_answers (guild_id INTEGER NOT NULL, trigger TEXT NOT NULL, "
+    "title TEXT NOT NULL, description TEXT, image TEXT, PRIMARY KEY (guild_id, trigger))",
+    "CREATE TABLE IF NOT EXISTS guild_gift_codes (guild_id INTEGER NOT NULL, code TEXT NOT NULL, "
+    "expiration TEXT NOT NULL, PRIMARY KEY (guild_id, code))",
+    "CREATE TABLE IF NOT EXISTS guild_bots (guild_id INTEGER NOT NULL, user_id INTEGER NOT NULL, "
+    "PRIMARY KEY (guild_id, user_id))",
+)
+
+
+def normalize_trigger(trigger: str) -> str:
+    return " ".join(trigger.casefold().split())
+
+
+@dataclass(frozen=True)
+class GuildConfig:
+    """Settings for one guild; empty settings fall back to the global files."""
+
+    guild_id: int | None
+    channels: frozenset = frozenset()  # empty: use channelIDs.txt
+    disabled_intents: frozenset = frozenset()
+    answers: tuple = ()  # (trigger, embed), checked before the rules, longest trigger first
+    gift_codes: GiftCodeIndex | None = None  # None: use giftCodes.txt
+    bots: frozenset = frozenset()  # other bots whose messages get answers
+
+    def allows_channel(self, channel_id: int, default_channels) -> bool:
+        return channel_id in (self.channels or default_channels)
+
+    def custom_answer(self, content: str):
+        # content must already be normalized the way triggers are
+        for trigger, embed in self.answers:
+            if trigger in content:
+                return trigger, embed
+        return None
+
+
+class GuildConfigStore:
+    """Per-guild settings in SQLite with an in-memory copy for lookups.
+
+    Every guild's settings are read once at startup, so answering a message
+    is a dict lookup and never touches the database. Changes are written to
+    SQLite first and then that guild's cached entry is rebuilt, so a new
+    setting applies to the next message without a restart. Guilds without
+    settings share one default entry. render_answer(spec) and
+    render_gift_codes(codes) build the embeds once per change.
+    """
+
+    def __init__(self, path: str = "guilds.db", render_answer=None, render_gift_codes=None, default_bots=()):
+        self.path = path
+        self.render_answer = render_answer
+        self.render_gift_codes = render_gift_codes
+        self.default = GuildConfig(None, bots=frozenset(default_bots))
+        self._guilds = self.load_all()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+        return connection
+
+    def load_all(self, path: str | None = None) -> dict:
+        # path is accepted so this works as a DataFileWatcher loader
+        with closing(self._connect()) as connection:
+            guild_ids = {guild_id for table in ("guild_channels", "guild_intents", "guild_answers",
+                                                "guild_gift_codes", "guild_bots")
+                         for (guild_id,) in connection.execute(f"SELECT DISTINCT guild_id FROM {table}")}
+            return {guild_id: self._read(connection, guild_id) for guild_id in guild_ids}
+
+    def replace(self, guilds: dict):
+        # Picks up changes written by other processes sharing the database
+        self._guilds = guilds
+
+    def _read(self, connection, guild_id: int) -> GuildConfig:
+        def rows(query):
+            return connection.execute(query, (guild_id,)).fetchall()
+
+        channels = frozenset(channel_id for (channel_id,) in rows(
+            "SELECT channel_id FROM guild_channels WHERE guild_id = ?"))
+        disabled = frozenset(intent for (intent,) in rows(
+            "SELECT intent FROM guild_intents WHERE guild_id = ? AND enabled = 0"))
+        answers = tuple(
+            (trigger, self.render_answer({"title": title, "description": description, "image": image}))
+            for trigger, title, description, image in rows(
+                "SELECT trigger, title, description, image FROM guild_answers WHERE guild_id = ? "
+                "ORDER BY length(trigger) DESC, trigger")  # longest trigger wins
+        )
+        codes = [GiftCode(code, expiration, parse_expiration(expiration)) for code, expiration in rows(
+            "SELECT code, expiration FROM guild_gift_codes WHERE guild_id = ? ORDER BY rowid")]
+        bots = frozenset(user_id for (user_id,) in rows("SELECT user_id FROM guild_bots WHERE guild_id = ?"))
+        return GuildConfig(
+            guild_id,
+            channels=channels,
+            disabled_intents=disabled,
+            answers=answers,
+            gift_codes=GiftCodeIndex(self.render_gift_codes, codes) if codes else None,
+            bots=bots | self.default.bots,
+        )
+
+    def get(self, guild_id: int | None) -> GuildConfig:
+        return self._guilds.get(guild_id, self.default)
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    def _write(self, guild_id: int, statement: str, parameters: tuple) -> bool:
+        with closing(self._connect()) as connection:
+            with connection:
+                changed = connection.execute(statement, parameters).rowcount > 0
+            config = self._read(connection, guild_id)
+        if config.channels or config.disabled_intents or config.answers or config.gift_codes or \
+                config.bots - self.default.bots:
+            self._guilds[guild_id] = config
+        else:
+            self._guilds.pop(guild_id, None)
+        return changed
+
+    # Write-through setters, each returns whether anything changed
+
+    def add_channel(self, guild_id: int, channel_id: int) -> bool:
+        return self._write(guild_id, "INSERT OR IGNORE INTO guild_channels VALUES (?, ?)", (guild_id, channel_id))
+
+    def remove_channel(self, guild_id: int, channel_id: int) -> bool:
+        return self._write(guild_id, "DELETE FROM guild_channels WHERE guild_id = ? AND channel_id = ?",
+                           (guild_id, channel_id))
+
+    def set_intent_enabled(self, guild_id: int, intent: str, enabled: bool) -> bool:
+        if enabled:
+            return self._write(guild_id, "DELETE FROM guild_intents WHERE guild_id = ? AND intent = ?", (guild_id, intent))
+        return self._write(guild_id, "INSERT OR REPLACE INTO guild_intents VALUES (?, ?, 0)", (guild_id, intent))
+
+    def set_answer(self, guild_id: int, trigger: str, title: str, description: str | None = None,
+                   image: str | None = None) -> bool:
+        return self._write(guild_id, "INSERT OR REPLACE INTO guild_answers VALUES (?, ?, ?, ?, ?)",
+                           (guild_id, normalize_trigger(trigger), title, description, image))
+
+    def remove_answer(self, guild_id: int, trigger: str) -> bool:
+        return self._write(guild_id, "DELETE FROM guild_answers WHERE guild_id = ? AND trigger = ?",
+                           (guild_id, normalize_trigger(trigger)))
+
+    def add_gift_code(self, guild_id: int, code: str, expiration: str) -> bool:
+        if parse_expiration(expiration) is None:
+            raise ValueError(f"unrecognised expiry date {expiration!r}")
+        return self._write(guild_id, "INSERT OR REPLACE INTO guild_gift_codes VALUES (?, ?, ?)",
+                           (guild_id, code, expiration))
+
+    def remove_gift_code(self, guild_id: int, code: str) -> bool:
+        return self._write(guild_id, "DELETE FROM guild_gift_codes WHERE guild_id = ? AND code = ?", (guild_id, code))
+
+    def add_bot(self, guild_id: int, user_id: int) -> bool:
+        return self._write(guild_id, "INSERT OR IGNORE INTO guild_bots VALUES (?, ?)", (guild_id, user_id))
+
+    def remove_bot(self, guild_id: int, user_id: int) -> bool:
+        return self._write(guild_id, "DELETE FROM guild_bots WHERE guild_id = ? AND user_id = ?", (guild_id, user_id))
@@ -1,14 +1,45 @@
+import time
+STARTED_AT = time.perf_counter()  # startup phases are measured from here
+
+import asyncio
+import json
 import os
-import re
+import signal
 import discord
 from dotenv import load_dotenv
 from discord.ext import commands
 
+from dataWatcher import DataFileWatcher
+from feedback import FeedbackStore
+from guildConfig import GuildConfigStore, normalize_trigger
+import helpEngine
+import metrics
+from outbound import OutboundQueue
+from responseCache import RecentAnswers
+
+# Durations of the startup phases, plus "ready" and "first answer" measured from STARTED_AT
+startup_times = {"imports": time.perf_counter() - STARTED_AT}
+STARTUP_MILESTONES = ("ready", "first answer")
+
 # Load environment variables
 load_dotenv()
 
 # Constants
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
+METRICS_FILE = os.getenv("METRICS_FILE", "helpbot.prom")
+METRICS_FLUSH_INTERVAL = 15
+FEEDBACK_DB = os.getenv("FEEDBACK_DB", "feedback.db")
+COMMAND_PREFIX = "!"
+FEEDBACK_FLUSH_INTERVAL = 10
+GUILD_DB = os.getenv("GUILD_DB", "guilds.db")
+DEFAULT_BOT_IDS = {1365209252846768199}  # bots answered in every guild, more can be added per guild
+SHARD_COUNT = os.getenv("SHARD_COUNT", "1")  # "auto" lets Discord recommend a count
+SHARD_IDS = os.getenv("SHARD_IDS")  # e.g. "0,1,2": the shards this process runs, set by shardSupervisor.py
+SHARD_HEALTH_FILE = os.getenv("SHARD_HEALTH_FILE")
+SHARD_HEALTH_INTERVAL = 10
+ASSET_CHANNEL_ID = os.getenv("ASSET_CHANNEL_ID")  # where response images are uploaded; unset keeps the external links
+ASSET_SYNC_INTERVAL = 3600
+REPEAT_WINDOW = 60  # seconds a channel's answer is linked to instead of posted again
 
 def load_allowed_channel_ids(path="channelIDs.txt"):
     allowed_ids = set()
@@ -22,344 +53,145 @@ def load_allowed_channel_ids(path="channelIDs.txt"):
                     continue  # skip lines that don't start with an integer
     return allowed_ids
 
+def reload_allowed_channel_ids(path="channelIDs.txt"):
+    # An empty file at startup is a valid setup, guilds can pick channels with !config; while running it
+    # is far more likely an edit in progress, so raising keeps the last good set in place
+    allowed_ids = load_allowed_channel_ids(path)
+    if not allowed_ids:
+        raise ValueError(f"No channel IDs found in {path}")
+    return allowed_ids
+
 ALLOWED_CHANNEL_IDS = load_allowed_channel_ids()
 
 intents = discord.Intents.default()
 intents.message_content = True
 
-def load_tc_requirements(path="tcReqirements.txt"):
-    tc_data = {}
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.read().splitlines()
-        for line in lines[1:]:  # Skip header
-            parts = line.strip().split("|")
-            if len(parts) == 7:
-                level = int(parts[0])
-                tc_data[level] = {
-                    "Prerequisites": parts[1],
-                    "Bread": parts[2],
-                    "Wood": parts[3],
-                    "Coal": parts[4],
-                    "Iron": parts[5],
-                    "Upgrade Time": parts[6]
-                }
-    return tc_data
-
-tc_data = load_tc_requirements()
-
-def load_gift_codes_and_expiration(path="giftCodes.txt"):
-    gift_codes = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                parts = line.split()  # Split by whitespace to separate code and date
-                if len(parts) == 2:
-                    gift_code = parts[0]
-                    expiration_date = parts[1]
-                    gift_codes.append(f"{gift_code} (Expire {expiration_date} at 23:59 UTC)")
-    return gift_codes
-
-gift_codes = load_gift_codes_and_expiration()
-
-bot = commands.Bot(command_prefix="!", intents=intents)
-
-def parse_time_to_seconds(text: str) -> int:
-    time_units = {
-        "day": 86400,
-        "hour": 3600,
-        "minute": 60,
-    }
-    total_seconds = 0
-    for unit, multiplier in time_units.items():
-        match = re.search(rf"(\d+)\s*{unit}", text)
-        if match:
-            total_seconds += int(match.group(1)) * multiplier
-    return total_seconds
-
-def format_seconds_to_text(seconds: int) -> str:
-    days = seconds // 86400
-    seconds %= 86400
-    hours = seconds // 3600
-    seconds %= 3600
-    minutes = seconds // 60
-
-    parts = []
-    if days: parts.append(f"{days} day{'s' if days != 1 else ''}")
-    if hours: parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
-    if minutes: parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
-    return ", ".join(parts) if parts else "0 minutes"
-
-def get_tc_requirements_embed(level: int, percent: int = 0):
-    if level in tc_data:
-        data = tc_data[level]
-        upgrade_time = data['Upgrade Time']
-
-        if percent > 0:
-            base_seconds = parse_time_to_seconds(upgrade_time)
-            adjusted_seconds = round(base_seconds / (1 + float(percent) / 100))
-            upgrade_time = format_seconds_to_text(adjusted_seconds)
-
-        if percent != 0:
-            return discord.Embed(
-                    title=f"📋 Town Center Level **{level}** Requirements with **{percent}**% construction speed",
-                description=(
-                    f"• **Prerequisites**: {data['Prerequisites']}\n"
-                    f"• **Base Bread**: {data['Bread']}\n"
-                    f"• **Base Wood**: {data['Wood']}\n"
-                    f"• **Base Coal**: {data['Coal']}\n"
-                    f"• **Base Iron**: {data['Iron']}\n"
-                    f"• **Upgrade Time**: {upgrade_time}"
-                ),
-                color=0x2ecc71
-            )
-        else:
-            return discord.Embed(
-                    title=f"📋 Town Center Level **{level}** Requirements",
-                description=(
-                    f"• **Prerequisites**: {data['Prerequisites']}\n"
-                    f"• **Base Bread**: {data['Bread']}\n"
-                    f"• **Base Wood**: {data['Wood']}\n"
-                    f"• **Base Coal**: {data['Coal']}\n"
-                    f"• **Base Iron**: {data['Iron']}\n"
-                    f"• **Upgrade Time**: {upgrade_time}"
-                ),
-                color=0x2ecc71
-            )
-        
+def make_bot():
+    # One shard keeps the plain single-connection bot
+    shard_count = None if SHARD_COUNT == "auto" else int(SHARD_COUNT)
+    shard_ids = [int(shard_id) for shard_id in SHARD_IDS.split(",")] if SHARD_IDS else None
+    if shard_count == 1 and shard_ids is None:
+        return commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents)
+    return commands.AutoShardedBot(command_prefix=COMMAND_PREFIX, intents=intents, shard_count=shard_count,
+                                   shard_ids=shard_ids)
+
+bot = make_bot()
+
+# 👍/👎 on an answer are traced back to the intents that produced it
+feedback = FeedbackStore(FEEDBACK_DB)
+
+# Replies go through per-channel queues that respect Discord's rate limits
+def on_reply_sent(message: discord.Message, replies):
+    feedback.remember(message.id, [reply.intent for reply in replies])
+    if "first answer" not in startup_times:
+        startup_times["first answer"] = time.perf_counter() - STARTED_AT
+        print(f"⏱️ Startup: {format_startup_times()}")
+
+outbound_queue = OutboundQueue(on_sent=on_reply_sent)
+metrics.METRICS.gauge("outbound_queue_depth", "Replies waiting to be sent.", lambda: outbound_queue.depth)
+
+def set_allowed_channel_ids(channel_ids):
+    global ALLOWED_CHANNEL_IDS
+    ALLOWED_CHANNEL_IDS = channel_ids
+
+# Data files are polled and swapped in while the bot runs, no restart needed
+data_watcher = DataFileWatcher(interval=5.0)
+data_watcher.watch("channelIDs.txt", reload_allowed_channel_ids, set_allowed_channel_ids)
+helpEngine.watch_data_files(data_watcher)
+
+recent_answers = RecentAnswers(REPEAT_WINDOW)
+
+# Per-guild channels, intents, answers and gift codes; guilds without settings use the global files
+guild_configs = GuildConfigStore(GUILD_DB, render_answer=helpEngine.build_embed,
+                                 render_gift_codes=helpEngine.build_gift_codes_embed, default_bots=DEFAULT_BOT_IDS)
+# Changes made by other workers; SQLite commits atomically, so there's no half-written state to wait out
+data_watcher.watch(GUILD_DB, guild_configs.load_all, guild_configs.replace, settle=False)
+
+def format_startup_times() -> str:
+    phases = {**startup_times, **helpEngine.startup_times}
+    return ", ".join(f"{name} {'at ' if name in STARTUP_MILESTONES else ''}{seconds * 1000:.0f} ms"
+                     for name, seconds in sorted(phases.items(), key=lambda item: item[0] in STARTUP_MILESTONES))
+
+def build_repeat_embed(earlier: discord.Message) -> discord.Embed:
+    return discord.Embed(
+        description=f"⬆️ This was just answered: [see the answer]({earlier.jump_url})",
+        color=0x95a5a6
+    )
+
+def get_guild_response(config, content: str) -> tuple[str | None, discord.Embed | None]:
+    if config.answers:
+        answer = config.custom_answer(normalize_trigger(content))
+        if answer is not None:
+            metrics.intent_hits.inc("custom")
+            return "custom", answer[1]
+
+    intent, embed = helpEngine.get_intent_response(content)
+    if intent in config.disabled_intents:
+        return None, None
+    if intent == "gift_codes" and config.gift_codes is not None:
+        config.gift_codes.evict_expired()
+        embed = config.gift_codes.embed
+    return intent, embed
+
+def shard_health() -> dict:
+    guilds = {}
+    for guild in bot.guilds:
+        guilds[guild.shard_id] = guilds.get(guild.shard_id, 0) + 1
+    if isinstance(bot, commands.AutoShardedBot):
+        shards = {shard_id: {"latency": shard.latency, "closed": shard.is_closed(), "guilds": guilds.get(shard_id, 0)}
+                  for shard_id, shard in bot.shards.items()}
     else:
-        return discord.Embed(
-            title="❗ Invalid Town Center Level",
-            description="Valid levels are between 2 and 30.",
-            color=0xe74c3c
-        )
-
-
-def get_embed_response(content: str) -> discord.Embed | None:
-    content = content.casefold()
-
-
-    if ("requirements" in content or "prerequisites" in content or "cost" in content) and ("tc" in content or "town center" in content or "town centre" in content):
-        # Use regex to find all digits
-        numbers = re.findall(r"\d+(?:\.\d+)?", content)  # Find all sequences of digits
-        print("Extracted Numbers:", numbers)
-        if numbers:
-            level = int(numbers[0])  # Extract the first number found
-            percent = float(numbers[1]) if len(numbers) > 1 else 0
-            #print(f"Level found: {level}")
-            return get_tc_requirements_embed(level, percent)  # Return embed based on the first level found
-    if "helpbotactive?" in content:
-        return discord.Embed(
-            title="Hello! 👋",
-            color=0x000000
-        )
-    elif ("are" in content or "any" in content or "how" in content) and "code" in content:
-        # Display gift codes or expiration message
-        if gift_codes:
-            description = "\n".join([f"• **{code}**" for code in gift_codes])
-            description += "\n\n🔗 Redeem on Website: https://ks-giftcode.centurygame.com/"
-            description += "\n🕹️ Redeem in-game(Android users only): Avatar(top-left on Main Interface) -> Settings -> Gift Code"
-            return discord.Embed(
-                title="🎁 Gift Codes:",
-                description=description,
-                color=0x00ff99
-            )
-        else:
-            return discord.Embed(
-                title="🎁 Gift Codes:",
-                description="None currently active",
-                color=0xe74c3c
-            )
-    elif (content.startswith("how") or content.startswith("can") or (content.startswith("is")) or content.startswith("does") or "?" in content) and ("change" in content or "move" in content or "teleport" in content or "transfer" in content ) and ("state" in content or "server" in content or "region" in content):
-        return discord.Embed(
-            title="📦 Can you move states?",
-            description=("There's no way to move your city to another state.\n"
-                         "👉 However, you can create a new character:\n"
-                         "`Profile Pic > Settings > Characters > Create New Character`"),
-            color=0x3498db
-        )
-    elif "does" in content and "auto" in content and ("bear" in content or "pitfall" in content):
-        return discord.Embed(
-            title="🐾 Does auto-rally work for bear trap?",
-            description="No, you must be online and manually join rallies.",
-            color=0xe74c3c
-        )
-    elif ("what" in content or "which" in content or "?" in content) and ("bear trap" in content or "bear" in content or "pitfall" in content) and ("heroes" in content or "use" in content):
-        return discord.Embed(
-            title="🐻 What heroes do you use for the bear trap?",
-            description=("For the bear trap, use you three strongest attacking heroes when starting rallies.  When joining rallies use a lead hero that boosts rally lethality. During gen1 these heroes are only Amadaeus and Chenko"),
-            color=0x3498db
-        )
-    elif "when" in content and "does" in content and ("fog" in content or "fertile land" in content or "plains" in content):
-        return discord.Embed(
-            title="🌫️ When does the fog move?",
-            description=("• **Day 14** — Reveals the *Plains*\n"
-                         "• **Day 39** — Reveals the *Fertile Land*"),
-            color=0x9b59b6
-        )
-    elif ("should" in content or "?" in content) and "save" in content and "keys" in content:
-        return discord.Embed(
-            title="🔑 Should I save my keys?",
-            description=("**No**, there are no standard events that require keys.\nHowever there may be special events in the future that take them.\n"),
-            color=0x2ecc71
-        )
-    elif ("what" in content or "which" in content or "?" in content) and ("thing" in content or "way" in content or "should" in content or "spend gems" in content or "use gems" in content) and ("gems" in content):
-        return discord.Embed(
-            title="💎 What is the best thing to use gems on?",
-            description=("• **Lucky wheel** - This is the primary thing you should use gems on.\n"
-                         "• VIP, Hero Rally, Teleports and troop speedups can also be good depending on your situation.\n"),
-            color=0x8e44ad
-        )
-    elif ("how to" in content or "how do" in content or "when" in content) and ("are" in content or "?" in content) and ("get" in content or "released" in content) and ("gen2" in content or "gen 2" in content or "generation 2" in content):
-        return discord.Embed(
-            title="🦸‍♂️ When are Gen 2 heroes released?",
-            description=("Gen2 heroes are released between day 40 and 50 of your state with the third Hall of Governors"),
-            color=0x2980b9
-        )
-    elif ("when are" in content) and ("gen2" in content or "gen 2" in content or "generation 2" in content) and ("released" in content or "available" in content):
-        return discord.Embed(
-            title="🦸‍♂️ When are Gen 2 heroes released?",
-            description=("Gen2 heroes are released between day 40 and 50 of your state. With the third Hall of Governors"),
-            color=0x2980b9
-        )
-    elif ("amadeus" in content) and ("or" in content) and ("zoe" in content):
-        return discord.Embed(
-            title="🦸‍♂️ Amadeus or Zoe?",
-            description=("• **Amadeus** is better on attack.\n"
-                         "• **Zoe** is better for defense.\n"),
-            color=0x2980b9
-        )
-    elif ("which" in content or "who" in content or "what" in content) and ("hero" in content) and ("wheel" in content or "roulette" in content):
-        return discord.Embed(
-            title="🎡 Which heroes are in hero roulette?",
-            description=("• gen1: Saul\n"
-                         "• gen2: Zoe\n"),
-            color=0x3498db
-        )
-    elif (content.startswith("when") or "time" in content or "?" in content) and ("pets" in content) and ("released" in content or "available" in content or "come" in content or "arrive" in content):
-        return discord.Embed(
-            title="🐾 When are pets released?",
-            description=("Pets are released on day 55 of your state (The day after King's Castle). \n"),
-            color=0x3498db
-        )
-    elif ("when" in content or "what day" in content or "how often" in content) and ("is" in content) and ("king's Castle" in content or "king Castle"):
-        return discord.Embed(
-            title="🏰 When is King's Castle?",
-            description=("• The first King's Castle is on day 54 of your state.\n"
-                         "• After that it will take place every 2 weeks on Saturdays.\n"
-                         "• King's Castle always starts at 12:00 UTC.\n"),
-            color=0xf1c40f
-        )
-    elif ("what" in content) and ("tc" in content or "town center" in content or "town centre" in content) and ("hero gear" in content):
-        return discord.Embed(
-            title="🏰 What TC level is required for hero gear?",
-            description=("• **TC15** is required for hero gear.\n"
-                         "• **TC20** is required for hero gear mastery foraging.\n"),
-            color=0x3498db
-        )
-    elif ("what" in content) and ("tc" in content or "town center" in content or "town centre" in content) and ("governor gear" in content):
-        return discord.Embed(
-            title="🏰 What TC level is required for governor gear?",
-            description=("• **TC22** is required for governor gear.\n"),
-            color=0x3498db
-        )
-    elif ("what" in content) and ("tc" in content or "town center" in content or "town centre" in content) and ("charm" in content):
-        return discord.Embed(
-            title="🏰 What TC level is required for charms?",
-            description=("• **TC25** is required for governor charms\n"),
-            color=0x3498db
-        )
-    elif ((("how" in content) and ("often" in content)) or ("when" in content and "is" in content)) and "fishing" in content:
-        return discord.Embed(
-            title="🎣 How often is the fishing even?",
-            description=("The fishing event is **monthly**\n"),
-            color=0x3498db
-        )
-    elif ((("how" in content) and (("often" in content)) or ("when" in content and "is" in content)))  and ("hall of governors" in content or "hog" in content):
-        return discord.Embed(
-            title="🏰 How often is the Hall of Governors event?",
-            description=("The Hall of Governors event is generally every **2 weeks**\n"),
-            color=0x3498db
-        )
-    elif ((("how" in content) and (("often" in content)) or ("when" in content and "is" in content))) and ("swordland" in content):
-        return discord.Embed(
-            title="⚔️ How often is the Swordland Sowdown event?",
-            description=("The Swordland event is generally every **2 weeks**\n"),
-            color=0x3498db
-        )
-    elif ((content.startswith("what") or content.startswith("how")) and ("vip" in content) and ("cost" in content or "requirements" in content or ("much" in content and "xp" in content))):
-        embed = discord.Embed(
-            title="💎 What are the VIP requirements?",
-            color=0x3498db
-        )
-        embed.set_image(url="https://i.imgur.com/YLhEDYv.png")
-        return embed
-    elif (("how" in content) and ("much" in content or "many" in content) and ("res" in content or "resources" in content) and ("banner" in content or "flag" in content) and ("destroy" in content or "dismantle" in content)):
-        return discord.Embed(
-            title="🏴 How many resources are refunded when you destroy a banner?",
-            description=("You get **10%** of the resources back from destroying a banner.\n"),
-            color=0x3498db
-        )
-    elif ("can" in content or "what" in content or "?" in content) and ("do" in content or "use" in content) and ("extra" in content or "leftover" in content) and ("hero shards" in content or "shards" in content):
-        return discord.Embed(
-            title="🦸‍♂️ Can I do anything with extra hero shards?",
-            description=("Yes there is an event called **Champagne Fair** where you can exchange extra hero shards for tickets.\n"
-                        "1 rare shard = 6 tickets\n"
-                        "1 epic shard = 10 tickets\n"
-                        "1 legendary shard = 200 tickets\n"),
-            color=0x3498db
-        )
-    elif ("do" in content or "will" in content or "?" in content) and ("purchases" in content or "items" in content or "packs" in content) and ("transfer" in content or "move" in content) and ("account" in content or "server" in content or "state" in content):
-        return discord.Embed(
-            title="💰 Do purchases on account transfer to new servers?",
-            description=("No, purchases made on an account do not transfer to new servers. Items and packs are tied to the state/character where they were purchased."),
-            color=0xe74c3c
-        )
-    elif ("how many" in content or "?" in content or "how long" in content or "how often" in content) and ("dayz" in content or "days" in content or "long" in content) and ("ke" in content or "kill event" in content or "all out" in content or "allout" in content):
-        return discord.Embed(
-            title="⚔️ How many days is KE?",
-            description=("The Kill Event (All Out), lasts for **2 days**.\n"
-                         "It is generally every **2 weeks** and takes place onf Friday to Saturday.\n"),
-            color=0xe74c3c
-        )
-    elif ("how" in content or "where" in content or "?" in content) and ("make" in content or "give" in content) and ("suggestion" in content or "feedback" in content):
-        return discord.Embed(
-            title="💡 How to make a suggestion?",
-            description="See the **#feedback** channel to share your suggestions!",
-            color=0x3498db
-        )
-    elif ("how" in content or "?" in content) and ("get" in content or "unlock" in content) and ("burst of life" in content or ("burst" in content and "life" in content)):
-        return discord.Embed(
-            title="🌟 How to get the Burst of Life skin?",
-            description="Reach **4M power** during the **Rookies Growth** event in the first week of a state.",
-            color=0x3498db
-        )
-    elif ("is there" in content or "?" in content) and ("event" in content) and ("charms" in content):
-        return discord.Embed(
-            title="🏰 Is there an event for upgrading charms?",
-            description="The 4th Hall of Governors has a day for upgrading charms.",
-            color=0x3498db
-        )
-    """
-    elif "show.me" in content:
-        import subprocess
-        result = subprocess.run(["python", "showMe.py", content], capture_output=True, text=True)
-        if result.stdout:
-            import json
-            response = json.loads(result.stdout)
-            embed = discord.Embed(
-                title=response.get("title", ""),
-                description=response.get("description", None),
-                color=response.get("color", 0x3498db)
-            )
-            if response.get("image_url"):
-                embed.set_image(url=response["image_url"])
-            return embed
-        """
+        shards = {0: {"latency": bot.latency, "closed": bot.is_closed(), "guilds": len(bot.guilds)}}
+    return {
+        "pid": os.getpid(),
+        "time": time.time(),
+        "shards": shards,
+        "messages_seen": metrics.messages_seen.total(),
+        "outbound_queue_depth": outbound_queue.depth,
+    }
+
+def write_shard_health(path: str):
+    # Write then rename so the supervisor never reads a half-written file
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(shard_health(), f)
+    os.replace(f"{path}.tmp", path)
+
+shard_health_task = None
+
+def start_shard_health(path: str, interval: float):
+    global shard_health_task
+
+    async def write_periodically():
+        while True:
+            try:
+                write_shard_health(path)
+            except OSError:
+                print(f"❌ Writing shard health to {path} failed")
+            await asyncio.sleep(interval)
+
+    if shard_health_task is None or shard_health_task.done():
+        shard_health_task = asyncio.get_running_loop().create_task(write_periodically())
+
+@bot.event
+async def setup_hook():
+    # Runs before the gateway connects; a warm start restores the engine data from its snapshot and
+    # the fallback index from its cache, so no message waits on numpy or a refit
+    await asyncio.to_thread(helpEngine.preload)
 
 @bot.event
 async def on_ready():
+    startup_times.setdefault("ready", time.perf_counter() - STARTED_AT)
     print(f"✅ Bot is ready. Logged in as {bot.user}.")
+    data_watcher.start()
+    helpEngine.gift_code_index.start()
+    metrics.METRICS.start_flush(METRICS_FILE, METRICS_FLUSH_INTERVAL)
+    feedback.start(FEEDBACK_FLUSH_INTERVAL)
+    if SHARD_HEALTH_FILE:
+        start_shard_health(SHARD_HEALTH_FILE, SHARD_HEALTH_INTERVAL)
+    if ASSET_CHANNEL_ID:
+        # Cached answers still hold the old image URLs once new ones are uploaded
+        helpEngine.assets.start(bot.get_partial_messageable(int(ASSET_CHANNEL_ID)), ASSET_SYNC_INTERVAL,
+                                on_change=helpEngine.response_cache.clear)
     await bot.change_presence(activity=discord.Activity(
         type=discord.ActivityType.listening,
         name="!help"
@@ -367,22 +199,214 @@ async def on_ready():
 
 @bot.event
 async def on_message(message: discord.Message):
-    if message.author.bot and message.author.id != 1365209252846768199:
+    config = guild_configs.get(message.guild.id if message.guild else None)
+    if message.author.bot and message.author.id not in config.bots:
         return
 
-    if message.channel.id not in ALLOWED_CHANNEL_IDS:
+    metrics.messages_seen.inc()
+    if not config.allows_channel(message.channel.id, ALLOWED_CHANNEL_IDS):
+        metrics.messages_dropped.inc("channel")
+        if message.content.startswith(f"{COMMAND_PREFIX}config"):
+            await bot.process_commands(message)  # so a new guild can pick its channels
         return
 
-    embed = get_embed_response(message.content)
+    received_at = time.monotonic()
+    # Guild answers have their own triggers, so those guilds always take the full path
+    tier = None if config.answers else helpEngine.prefilter_tier(message.content)
+    intent, embed = None, None
+    if tier is not None:
+        metrics.messages_dropped.inc(tier)
+    else:
+        plugin = helpEngine.plugins.find(message.content)
+        if plugin is not None:
+            embed = await helpEngine.plugins.run(plugin, message.content)
+            if embed:
+                intent = plugin.name
+                metrics.intent_hits.inc(intent)
+        if not embed:
+            # A plugin with no answer falls through to the rules, like a handler returning None
+            intent, embed = get_guild_response(config, message.content)
     if embed:
-        async with message.channel.typing():
-            sent_message = await message.channel.send(embed=embed)
-            await sent_message.add_reaction("👍")
-            await sent_message.add_reaction("👎")
+        answer_key = (intent, embed.title, embed.description)
+        earlier = recent_answers.find(message.channel.id, answer_key, received_at)
+        if earlier is None or earlier.failed:
+            # Answers are instant, so no typing indicator; the queue paces sends and adds the reactions
+            # An earlier answer that failed to send has nothing to link to, so this one is posted in full
+            reply = outbound_queue.enqueue(message.channel, embed, received_at, intent)
+            recent_answers.record(message.channel.id, answer_key, reply, received_at)
+        else:
+            metrics.repeat_answers.inc(intent)
+            if earlier.message is not None:
+                outbound_queue.enqueue(message.channel, build_repeat_embed(earlier.message), received_at, reactions=())
+            # else the earlier answer is still queued and will land right after this question anyway
+
+    if message.content.startswith(COMMAND_PREFIX):
+        await bot.process_commands(message)
+
+def handle_feedback_reaction(payload: discord.RawReactionActionEvent, added: bool):
+    if bot.user is not None and payload.user_id == bot.user.id:
+        return  # the bot's own 👍/👎 are just there to prompt users
+    feedback.record(payload.message_id, payload.user_id, str(payload.emoji), added)
+
+@bot.event
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    handle_feedback_reaction(payload, added=True)
+
+@bot.event
+async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+    handle_feedback_reaction(payload, added=False)
 
-    await bot.process_commands(message)
+@bot.command(name="feedback")
+async def feedback_report(ctx: commands.Context):
+    worst = feedback.worst(limit=10)
+    if worst:
+        description = "\n".join(f"• **{intent}**: 👍 {up} / 👎 {down}" for intent, up, down in worst)
+    else:
+        description = "No votes yet."
+    await ctx.send(embed=discord.Embed(
+        title="👎 Lowest rated answers",
+        description=description,
+        color=0xe74c3c
+    ))
+
+@bot.command(name="stats")
+async def stats(ctx: commands.Context):
+    def ms(histogram):
+        return f"p50 {histogram.quantile(0.5) * 1000:g} ms, p99 {histogram.quantile(0.99) * 1000:g} ms"
+
+    top_intents = sorted(metrics.intent_hits.values.items(), key=lambda item: item[1], reverse=True)[:10]
+    reply_latency = outbound_queue.latency_percentiles()
+    embed = discord.Embed(
+        title="📊 HelpBot Stats",
+        description=(
+            f"• **Messages seen**: {metrics.messages_seen.total()}\n"
+            f"• **Dropped by channel filter**: {metrics.messages_dropped.values.get('channel', 0)}\n"
+            f"• **Answers**: {metrics.intent_hits.total()}\n"
+            f"• **Repeat questions linked**: {metrics.repeat_answers.total()}\n"
+            f"• **Response cache**: {helpEngine.response_cache.hits} hits, {helpEngine.response_cache.misses} misses, "
+            f"{len(helpEngine.response_cache)} entries\n"
+            f"• **Startup**: {format_startup_times()}\n"
+            f"• **Match time**: {ms(metrics.match_seconds)}\n"
+            f"• **Embed build time**: {ms(metrics.embed_build_seconds)}\n"
+            f"• **Discord send time**: {ms(metrics.send_seconds)}\n"
+            f"• **Discord reaction time**: {ms(metrics.reaction_seconds)}\n"
+            f"• **Reply latency**: p50 {reply_latency['p50'] * 1000:.0f} ms, p99 {reply_latency['p99'] * 1000:.0f} ms\n"
+            f"• **Outbound queue depth**: {outbound_queue.depth}"
+        ),
+        color=0x3498db
+    )
+    if top_intents:
+        embed.add_field(name="Top intents", value="\n".join(f"{intent}: {count}" for intent, count in top_intents))
+    await ctx.send(embed=embed)
 
-if DISCORD_TOKEN:
-    bot.run(DISCORD_TOKEN)
-else:
-    print("❌ Error: DISCORD_TOKEN is not set in environment variables.")
+@bot.command(name="shards")
+async def shards(ctx: commands.Context):
+    def status(shard):
+        return "closed" if shard["closed"] else f"{shard['latency'] * 1000:.0f} ms"
+
+    current = ctx.guild.shard_id if ctx.guild else None
+    description = "\n".join(
+        f"• **Shard {shard_id}**{' (this server)' if shard_id == current else ''}: {status(shard)}, {shard['guilds']} servers"
+        for shard_id, shard in sorted(shard_health()["shards"].items())
+    )
+    await ctx.send(embed=discord.Embed(title="🛰️ Shards in this process", description=description, color=0x3498db))
+
+def guild_managers_only(command):
+    # A group with invoke_without_command skips its own checks before a subcommand, so every command carries them
+    return commands.guild_only()(commands.has_guild_permissions(manage_guild=True)(command))
+
+# Guild settings: writes go to SQLite first, then the guild's cached config is rebuilt
+@bot.group(name="config", invoke_without_command=True)
+@guild_managers_only
+async def config_group(ctx: commands.Context):
+    config = guild_configs.get(ctx.guild.id)
+    channels = ", ".join(f"<#{channel_id}>" for channel_id in sorted(config.channels)) or "channelIDs.txt"
+    await ctx.send(embed=discord.Embed(
+        title="⚙️ Server settings",
+        description=(
+            f"• **Channels**: {channels}\n"
+            f"• **Disabled answers**: {', '.join(sorted(config.disabled_intents)) or 'none'}\n"
+            f"• **Custom answers**: {', '.join(trigger for trigger, _ in config.answers) or 'none'}\n"
+            f"• **Gift codes**: {len(config.gift_codes) if config.gift_codes is not None else 'giftCodes.txt'}\n"
+            "\n`!config channel add|remove`, `!config intent on|off <intent>`, "
+            "`!config answer set <trigger> | <title> | <description>`, `!config answer remove <trigger>`, "
+            "`!config giftcode add <CODE> <date>`, `!config giftcode remove <CODE>`, `!config bot add|remove <id>`"
+        ),
+        color=0x3498db
+    ))
+
+async def update_config(ctx: commands.Context, setter, *args):
+    try:
+        changed = await asyncio.to_thread(setter, ctx.guild.id, *args)
+    except ValueError as e:
+        await ctx.send(f"❗ {e}")
+        return
+    await ctx.message.add_reaction("✅" if changed else "➖")
+
+@config_group.command(name="channel")
+@guild_managers_only
+async def config_channel(ctx: commands.Context, action: str, channel: discord.TextChannel = None):
+    channel_id = (channel or ctx.channel).id
+    if action == "add":
+        await update_config(ctx, guild_configs.add_channel, channel_id)
+    elif action == "remove":
+        await update_config(ctx, guild_configs.remove_channel, channel_id)
+    else:
+        await ctx.send("❗ Use `!config channel add` or `!config channel remove`")
+
+@config_group.command(name="intent")
+@guild_managers_only
+async def config_intent(ctx: commands.Context, state: str, intent: str):
+    if intent not in helpEngine.RULES_BY_INTENT or state not in ("on", "off"):
+        await ctx.send(f"❗ Use `!config intent on|off <intent>` with one of: {', '.join(helpEngine.RULES_BY_INTENT)}")
+        return
+    await update_config(ctx, guild_configs.set_intent_enabled, intent, state == "on")
+
+@config_group.command(name="answer")
+@guild_managers_only
+async def config_answer(ctx: commands.Context, action: str, *, text: str):
+    if action == "set":
+        parts = [part.strip() for part in text.split("|")]
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            await ctx.send("❗ Use `!config answer set <trigger> | <title> | <description>`")
+            return
+        await update_config(ctx, guild_configs.set_answer, parts[0], parts[1], "|".join(parts[2:]) or None)
+    elif action == "remove":
+        await update_config(ctx, guild_configs.remove_answer, text)
+    else:
+        await ctx.send("❗ Use `!config answer set` or `!config answer remove`")
+
+@config_group.command(name="giftcode")
+@guild_managers_only
+async def config_gift_code(ctx: commands.Context, action: str, code: str, expiration: str = None):
+    if action == "add" and expiration:
+        await update_config(ctx, guild_configs.add_gift_code, code, expiration)
+    elif action == "remove":
+        await update_config(ctx, guild_configs.remove_gift_code, code)
+    else:
+        await ctx.send("❗ Use `!config giftcode add <CODE> <YYYY-MM-DD>` or `!config giftcode remove <CODE>`")
+
+@config_group.command(name="bot")
+@guild_managers_only
+async def config_bot(ctx: commands.Context, action: str, user_id: int):
+    if action == "add":
+        await update_config(ctx, guild_configs.add_bot, user_id)
+    elif action == "remove":
+        await update_config(ctx, guild_configs.remove_bot, user_id)
+    else:
+        await ctx.send("❗ Use `!config bot add <id>` or `!config bot remove <id>`")
+
+startup_times["bot setup"] = time.perf_counter() - STARTED_AT - startup_times["imports"]
+
+if __name__ == "__main__":
+    if DISCORD_TOKEN:
+        # shardSupervisor stops workers with SIGTERM; handled like Ctrl+C so bot.run returns and the votes get saved
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            bot.run(DISCORD_TOKEN)
+        finally:
+            saved = feedback.flush()
+            if saved:
+                print(f"💾 Saved {saved} pending feedback votes")
+    else:
+        print("❌ Error: DISCORD_TOKEN is not set in environment variables.")
@@ -0,0 +1,336 @@
+import os
+import re
+import threading
+import time
+import discord
+
+import giftCodeIndex
+import helpRules
+import metrics
+import ruleEngine
+import tcTable
+from assetCache import AssetCache
+from dataSnapshot import describe_sources, load_snapshot, save_snapshot
+from giftCodeIndex import GiftCodeIndex, load_gift_codes_and_expiration
+from helpRules import RULES
+from pluginRegistry import PluginRegistry
+from prefilter import Prefilter
+from responseCache import ResponseCache
+from ruleEngine import compile_rules
+from tcTable import RESOURCES, load_tc_requirements
+
+# Constants
+TC_FILE = "tcReqirements.txt"
+GIFT_CODES_FILE = "giftCodes.txt"
+SNAPSHOT_FILE = os.getenv("HELP_SNAPSHOT", "helpData.snapshot")
+# The snapshot holds objects from these modules, so editing them invalidates it like editing a data file
+CODE_SOURCES = tuple(module.__file__ for module in (helpRules, ruleEngine, tcTable, giftCodeIndex))
+FALLBACK_INDEX = "fallbackIndex.npz"
+FALLBACK_MIN_LENGTH = 10  # fallbackClassifier.MIN_LENGTH, repeated so the prefilter doesn't import numpy
+RESPONSE_CACHE_SIZE = 2048
+PLUGIN_MODULES = ("showMe",)
+ASSET_DIR = os.getenv("ASSET_DIR", "assets")
+ASSET_DB = os.getenv("ASSET_DB", "assets.db")
+
+# The range has to follow a whole TC word, so "match 3 to 5" or "tomorrow 1-2" aren't TC questions
+TC_RANGE_PATTERN = re.compile(r"\b(?:tc|town cent(?:er|re))\s*(?:level|lvl|from)?\s*(\d+)\s*(?:to|-)\s*(?:tc|level|lvl)?\s*(\d+)\b")
+
+# Loaded on first use by ensure_loaded(), so importing this module reads no files
+tc_data = None
+gift_code_index = None
+intent_matcher = None
+RULES_BY_INTENT = {}
+response_cache = None
+fallback_classifier = None
+prefilter = None
+startup_times = {}  # phase -> seconds
+_load_lock = threading.Lock()
+_fallback_lock = threading.Lock()
+
+# Response images are uploaded to Discord once and replies point at the stored CDN URL
+assets = AssetCache(ASSET_DIR, ASSET_DB)
+
+# Commands like show.me are answered by in-process responders, imported on first use
+plugins = PluginRegistry(PLUGIN_MODULES, asset_url=assets.url)
+
+def load():
+    """Parse the data files and compile the rules, or restore them from the snapshot.
+
+    Safe to call from a worker thread while the bot connects; a message that
+    arrives first waits for the load instead of starting a second one.
+    """
+    global tc_data, gift_code_index, intent_matcher, RULES_BY_INTENT, response_cache, prefilter
+    with _load_lock:
+        if intent_matcher is not None:
+            return
+        start = time.perf_counter()
+        sources = (TC_FILE, GIFT_CODES_FILE) + CODE_SOURCES
+        snapshot = load_snapshot(SNAPSHOT_FILE, sources)
+        if snapshot is not None:
+            tc_table, gift_codes, matcher = snapshot
+            startup_times["snapshot load"] = time.perf_counter() - start
+        else:
+            described = describe_sources(sources)
+            startup_times["source hashing"] = time.perf_counter() - start
+            phase_start = time.perf_counter()
+            tc_table = load_tc_requirements(TC_FILE)
+            gift_codes = load_gift_codes_and_expiration(GIFT_CODES_FILE)
+            startup_times["data parsing"] = time.perf_counter() - phase_start
+            phase_start = time.perf_counter()
+            matcher = compile_rules(RULES)
+            startup_times["rule compile"] = time.perf_counter() - phase_start
+            phase_start = time.perf_counter()
+            save_snapshot(SNAPSHOT_FILE, described, (tc_table, gift_codes, matcher))
+            startup_times["snapshot save"] = time.perf_counter() - phase_start
+
+        tc_data = tc_table
+        assets.scan()  # URLs uploaded by earlier runs apply right away
+        RULES_BY_INTENT = {rule.intent: rule for rule in matcher.rules}
+        # Answers are cached per normalized question; punctuation the rules look for survives normalization
+        response_cache = ResponseCache(RESPONSE_CACHE_SIZE, keep={ch for keyword in matcher.keywords
+                                                                  for ch in keyword if not ch.isalnum() and not ch.isspace()})
+        # Expired codes are evicted on a timer and the embed is only rebuilt when the set changes
+        gift_code_index = GiftCodeIndex(render_gift_codes, gift_codes)
+        # Messages without a rule anchor or plugin trigger that are too short for the fallback exit early
+        plugins.discover()
+        prefilter = Prefilter(matcher.anchor_keywords | {plugin.trigger for plugin in plugins.plugins},
+                              FALLBACK_MIN_LENGTH)
+        intent_matcher = matcher  # set last: it marks the engine as loaded
+        startup_times["engine data"] = time.perf_counter() - start
+
+def ensure_loaded():
+    if intent_matcher is None:
+        load()
+
+def prefilter_tier(content: str) -> str | None:
+    # The prefilter tier that rules content out, None if it needs the full path
+    ensure_loaded()
+    return prefilter.check(content)
+
+def get_fallback_classifier():
+    global fallback_classifier
+    if fallback_classifier is None:
+        with _fallback_lock:
+            if fallback_classifier is None:
+                start = time.perf_counter()
+                # Imported here so importing the engine as a library doesn't load numpy
+                from fallbackClassifier import load_or_fit
+                # The fallback index is cached on disk and only refit when the rule examples change
+                fallback_classifier = load_or_fit(RULES, FALLBACK_INDEX)
+                startup_times["fallback index"] = time.perf_counter() - start
+    return fallback_classifier
+
+def preload():
+    """load() plus the fallback index, for servers to call from a worker thread before taking messages."""
+    load()
+    get_fallback_classifier()
+
+def set_tc_data(data):
+    global tc_data
+    ensure_loaded()
+    tc_data = data
+    response_cache.clear()
+
+def set_gift_codes(codes):
+    ensure_loaded()
+    gift_code_index.replace(codes)
+
+def watch_data_files(watcher):
+    # Data files are polled and swapped in while running, no restart needed
+    watcher.watch(TC_FILE, load_tc_requirements, set_tc_data)
+    watcher.watch(GIFT_CODES_FILE, load_gift_codes_and_expiration, set_gift_codes)
+
+def format_seconds_to_text(seconds: int) -> str:
+    days = seconds // 86400
+    seconds %= 86400
+    hours = seconds // 3600
+    seconds %= 3600
+    minutes = seconds // 60
+    seconds %= 60
+
+    parts = []
+    if days: parts.append(f"{days} day{'s' if days != 1 else ''}")
+    if hours: parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
+    if minutes: parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
+    if seconds: parts.append(f"{seconds} second{'s' if seconds != 1 else ''}")
+    return ", ".join(parts) if parts else "0 minutes"
+
+def format_amount(amount: int) -> str:
+    return str(amount) if amount else "N/A"
+
+def apply_construction_speed(seconds: int, percent: float) -> int:
+    if percent > 0:
+        return round(seconds / (1 + float(percent) / 100))
+    return seconds
+
+def get_invalid_tc_level_embed():
+    return discord.Embed(
+        title="❗ Invalid Town Center Level",
+        description=f"Valid levels are between {tc_data.min_level} and {tc_data.max_level}.",
+        color=0xe74c3c
+    )
+
+def get_tc_requirements_embed(level: int, percent: int = 0):
+    if level in tc_data:
+        data = tc_data.row(level)
+        upgrade_time = format_seconds_to_text(apply_construction_speed(data['Upgrade Time'], percent))
+
+        if percent != 0:
+            title = f"📋 Town Center Level **{level}** Requirements with **{percent}**% construction speed"
+        else:
+            title = f"📋 Town Center Level **{level}** Requirements"
+        return discord.Embed(
+            title=title,
+            description=(
+                f"• **Prerequisites**: {data['Prerequisites']}\n"
+                f"• **Base Bread**: {format_amount(data['Bread'])}\n"
+                f"• **Base Wood**: {format_amount(data['Wood'])}\n"
+                f"• **Base Coal**: {format_amount(data['Coal'])}\n"
+                f"• **Base Iron**: {format_amount(data['Iron'])}\n"
+                f"• **Upgrade Time**: {upgrade_time}"
+            ),
+            color=0x2ecc71
+        )
+    else:
+        return get_invalid_tc_level_embed()
+
+def is_valid_tc_range(start: int, end: int) -> bool:
+    # start may be the level below the table's first row, meaning the range starts from scratch
+    return start < end and end in tc_data and (start in tc_data or start == tc_data.min_level - 1)
+
+def get_tc_range_embed(start: int, end: int, percent: float = 0):
+    if not is_valid_tc_range(start, end):
+        return get_invalid_tc_level_embed()
+
+    totals = tc_data.range_totals(start, end)
+    upgrade_time = format_seconds_to_text(apply_construction_speed(totals['Upgrade Time'], percent))
+    title = f"📋 Town Center **{start}** → **{end}** Total Cost"
+    if percent != 0:
+        title += f" with **{percent}**% construction speed"
+    return discord.Embed(
+        title=title,
+        description=(
+            "".join(f"• **Total {name}**: {format_amount(totals[name])}\n" for name in RESOURCES)
+            + f"• **Total Upgrade Time**: {upgrade_time}"
+        ),
+        color=0x2ecc71
+    )
+
+def build_gift_codes_embed(gift_codes):
+    # Display gift codes or expiration message
+    if gift_codes:
+        description = "\n".join([f"• **{code}**" for code in gift_codes])
+        description += "\n\n🔗 Redeem on Website: https://ks-giftcode.centurygame.com/"
+        description += "\n🕹️ Redeem in-game(Android users only): Avatar(top-left on Main Interface) -> Settings -> Gift Code"
+        return discord.Embed(
+            title="🎁 Gift Codes:",
+            description=description,
+            color=0x00ff99
+        )
+    else:
+        return discord.Embed(
+            title="🎁 Gift Codes:",
+            description="None currently active",
+            color=0xe74c3c
+        )
+
+def render_gift_codes(gift_codes):
+    if response_cache is not None:
+        response_cache.clear()  # cached answers still hold the previous embed
+    return build_gift_codes_embed(gift_codes)
+
+def get_gift_codes_embed(content: str):
+    return gift_code_index.embed
+
+def get_tc_range_response(content: str):
+    # "tc 15 to 25 with 40%" -> totals for the upgrades from level 15 up to 25
+    match = TC_RANGE_PATTERN.search(content)
+    if not match:
+        return None
+    start, end = int(match.group(1)), int(match.group(2))
+    if not is_valid_tc_range(start, end):
+        return None  # "tc 20 - 3 days" is chat, not a range to price, so let the next rule answer
+    numbers = re.findall(r"\d+(?:\.\d+)?", content[match.end():])
+    percent = float(numbers[0]) if numbers else 0
+    return get_tc_range_embed(start, end, percent)
+
+def get_tc_requirements_response(content: str):
+    # Use regex to find all digits
+    numbers = re.findall(r"\d+(?:\.\d+)?", content)  # Find all sequences of digits
+    if numbers:
+        level = int(numbers[0])  # Extract the first number found
+        percent = float(numbers[1]) if len(numbers) > 1 else 0
+        #print(f"Level found: {level}")
+        return get_tc_requirements_embed(level, percent)  # Return embed based on the first level found
+    return None  # No level given, let the next rule answer
+
+RESPONSE_HANDLERS = {
+    "tc_range": get_tc_range_response,
+    "tc_requirements": get_tc_requirements_response,
+    "gift_codes": get_gift_codes_embed,
+}
+
+def build_embed(spec: dict) -> discord.Embed:
+    embed = discord.Embed(
+        title=spec.get("title"),
+        description=spec.get("description"),
+        color=spec.get("color", 0x3498db)
+    )
+    image = assets.url(spec["asset"], spec.get("image")) if spec.get("asset") else spec.get("image")
+    if image:
+        embed.set_image(url=image)
+    return embed
+
+def build_rule_response(rule, content: str) -> discord.Embed | None:
+    if rule.handler:
+        return RESPONSE_HANDLERS[rule.handler](content)
+    return build_embed(rule.embed)
+
+def get_intent_response(content: str) -> tuple[str | None, discord.Embed | None]:
+    start = time.perf_counter()
+    ensure_loaded()
+    key = response_cache.normalize(content)
+    cached = response_cache.get(key)
+    if cached is not None:
+        intent, embed = cached
+        metrics.response_cache_lookups.inc("hit")
+        metrics.match_seconds.observe(time.perf_counter() - start)
+        if intent:
+            metrics.intent_hits.inc(intent)
+        return intent, embed
+
+    metrics.response_cache_lookups.inc("miss")
+    intent, embed, build_seconds = resolve_intent(key)
+    response_cache.put(key, intent, embed)
+    metrics.match_seconds.observe(time.perf_counter() - start - build_seconds)
+    if intent:
+        metrics.embed_build_seconds.observe(build_seconds)
+        metrics.intent_hits.inc(intent)
+    return intent, embed
+
+def resolve_intent(content: str) -> tuple[str | None, discord.Embed | None, float]:
+    # Runs the rules, then the fallback, on normalized content; also returns the seconds spent building embeds
+    intent, embed, build_seconds = None, None, 0.0
+    for rule in intent_matcher.iter_matches(content):
+        build_start = time.perf_counter()
+        embed = build_rule_response(rule, content)
+        build_seconds += time.perf_counter() - build_start
+        if embed is not None:
+            intent = rule.intent
+            break
+
+    if intent is None:
+        # Nothing matched the keyword rules, try the typo-tolerant classifier
+        fallback_intent, _ = get_fallback_classifier().classify(content)
+        if fallback_intent is not None:
+            build_start = time.perf_counter()
+            embed = build_rule_response(RULES_BY_INTENT[fallback_intent], content)
+            build_seconds += time.perf_counter() - build_start
+            if embed is not None:
+                intent = fallback_intent
+                metrics.fallback_hits.inc(intent)
+
+    return intent, embed, build_seconds
+
+def get_embed_response(content: str) -> discord.Embed | None:
+    return get_intent_response(content)[1]
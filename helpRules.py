@@ -0,0 +1,396 @@
+# Declarative intent table for the help bot, evaluated top to bottom (first match wins).
+#
+# all_of: every group needs at least one of its terms in the message
+# any_of: list of all_of alternatives, the rule matches if one of them does
+# "^word": the message must start with word
+# embed:   static embed (title/description/color/image); "asset" names a file in assets/ that is
+#          uploaded to Discord once and used instead of image, which stays as the fallback
+# handler: name of a response function in helpEngine.py; returning None falls through to the next rule
+# examples: canonical questions for the typo-tolerant fallback classifier (fallbackClassifier.py)
+
+TC = ["tc", "town center", "town centre"]
+GEN2 = ["gen2", "gen 2", "generation 2"]
+
+RULES = [
+    {
+        "intent": "tc_range",
+        "all_of": [TC, ["to", "-"], ["cost", "requirements", "how much", "total", "need", "?"]],
+        "handler": "tc_range",
+    },
+    {
+        "intent": "tc_requirements",
+        "all_of": [["requirements", "prerequisites", "cost"], TC],
+        "handler": "tc_requirements",
+    },
+    {
+        "intent": "bot_active",
+        "all_of": [["helpbotactive?"]],
+        "embed": {
+            "title": "Hello! 👋",
+            "color": 0x000000,
+        },
+    },
+    {
+        "intent": "gift_codes",
+        "examples": [
+            "got a working gift code",
+            "any new codes",
+            "what is the current gift code",
+            "where can i redeem a code",
+        ],
+        "all_of": [["are", "any", "how"], ["code"]],
+        "handler": "gift_codes",
+    },
+    {
+        "intent": "move_state",
+        "examples": [
+            "is relocating to a different kingdom allowed",
+            "how do i transfer my city to a different server",
+            "is it possible to change region",
+            "can i switch servers to play with my friend",
+            "my friends play on another server can i go there",
+        ],
+        "all_of": [["^how", "^can", "^is", "^does", "?"], ["change", "move", "teleport", "transfer"], ["state", "server", "region"]],
+        "embed": {
+            "title": "📦 Can you move states?",
+            "description": ("There's no way to move your city to another state.\n"
+                            "👉 However, you can create a new character:\n"
+                            "`Profile Pic > Settings > Characters > Create New Character`"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "auto_rally",
+        "examples": [
+            "will auto rally hit the bear",
+            "does auto join work on the bear",
+        ],
+        "all_of": [["does"], ["auto"], ["bear", "pitfall"]],
+        "embed": {
+            "title": "🐾 Does auto-rally work for bear trap?",
+            "description": "No, you must be online and manually join rallies.",
+            "color": 0xe74c3c,
+        },
+    },
+    {
+        "intent": "bear_heroes",
+        "examples": [
+            "which lineup deals the most damage to the bear",
+            "which heroes are best for the bear",
+        ],
+        "all_of": [["what", "which", "?"], ["bear trap", "bear", "pitfall"], ["heroes", "use"]],
+        "embed": {
+            "title": "🐻 What heroes do you use for the bear trap?",
+            "description": ("For the bear trap, use you three strongest attacking heroes when starting rallies.  When joining rallies use a lead hero that boosts rally lethality. During gen1 these heroes are only Amadaeus and Chenko"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "fog",
+        "examples": [
+            "when does the fog move",
+            "when can we settle the plains",
+            "how long until fertile land is available",
+        ],
+        "all_of": [["when"], ["does"], ["fog", "fertile land", "plains"]],
+        "embed": {
+            "title": "🌫️ When does the fog move?",
+            "description": ("• **Day 14** — Reveals the *Plains*\n"
+                            "• **Day 39** — Reveals the *Fertile Land*"),
+            "color": 0x9b59b6,
+        },
+    },
+    {
+        "intent": "save_keys",
+        "examples": [
+            "should i hold on to my keys",
+            "is it worth keeping keys",
+        ],
+        "all_of": [["should", "?"], ["save"], ["keys"]],
+        "embed": {
+            "title": "🔑 Should I save my keys?",
+            "description": ("**No**, there are no standard events that require keys.\nHowever there may be special events in the future that take them.\n"),
+            "color": 0x2ecc71,
+        },
+    },
+    {
+        "intent": "gems",
+        "examples": [
+            "where should my gems go",
+            "what should i spend gems on",
+        ],
+        "all_of": [["what", "which", "?"], ["thing", "way", "should", "spend gems", "use gems"], ["gems"]],
+        "embed": {
+            "title": "💎 What is the best thing to use gems on?",
+            "description": ("• **Lucky wheel** - This is the primary thing you should use gems on.\n"
+                            "• VIP, Hero Rally, Teleports and troop speedups can also be good depending on your situation.\n"),
+            "color": 0x8e44ad,
+        },
+    },
+    {
+        "intent": "gen2_release",
+        "examples": [
+            "when do the second generation heroes arrive",
+            "how long until generation 2 heroes",
+            "how many days until gen2 heroes come out",
+            "countdown to gen 2",
+        ],
+        "all_of": [["how to", "how do", "when"], ["are", "?"], ["get", "released"], GEN2],
+        "embed": {
+            "title": "🦸‍♂️ When are Gen 2 heroes released?",
+            "description": ("Gen2 heroes are released between day 40 and 50 of your state with the third Hall of Governors"),
+            "color": 0x2980b9,
+        },
+    },
+    {
+        "intent": "gen2_available",
+        "all_of": [["when are"], GEN2, ["released", "available"]],
+        "embed": {
+            "title": "🦸‍♂️ When are Gen 2 heroes released?",
+            "description": ("Gen2 heroes are released between day 40 and 50 of your state. With the third Hall of Governors"),
+            "color": 0x2980b9,
+        },
+    },
+    {
+        "intent": "amadeus_or_zoe",
+        "examples": [
+            "should i build amadeus or zoe first",
+            "amadeus vs zoe",
+        ],
+        "all_of": [["amadeus"], ["or"], ["zoe"]],
+        "embed": {
+            "title": "🦸‍♂️ Amadeus or Zoe?",
+            "description": ("• **Amadeus** is better on attack.\n"
+                            "• **Zoe** is better for defense.\n"),
+            "color": 0x2980b9,
+        },
+    },
+    {
+        "intent": "hero_roulette",
+        "examples": [
+            "what can you win on the hero wheel",
+            "what heroes are in the roulette",
+        ],
+        "all_of": [["which", "who", "what"], ["hero"], ["wheel", "roulette"]],
+        "embed": {
+            "title": "🎡 Which heroes are in hero roulette?",
+            "description": ("• gen1: Saul\n"
+                            "• gen2: Zoe\n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "pets",
+        "examples": [
+            "when will pets be added",
+            "when do pets come out",
+        ],
+        "all_of": [["^when", "time", "?"], ["pets"], ["released", "available", "come", "arrive"]],
+        "embed": {
+            "title": "🐾 When are pets released?",
+            "description": ("Pets are released on day 55 of your state (The day after King's Castle). \n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        # The old chain tested ("king's Castle" in content or "king Castle"), which is always
+        # true, so this rule only ever depended on the question words below.
+        "intent": "kings_castle",
+        "examples": [
+            "when is kings castle",
+            "what day is the kings castle event",
+        ],
+        "all_of": [["when", "what day", "how often"], ["is"]],
+        "embed": {
+            "title": "🏰 When is King's Castle?",
+            "description": ("• The first King's Castle is on day 54 of your state.\n"
+                            "• After that it will take place every 2 weeks on Saturdays.\n"
+                            "• King's Castle always starts at 12:00 UTC.\n"),
+            "color": 0xf1c40f,
+        },
+    },
+    {
+        "intent": "tc_hero_gear",
+        "examples": [
+            "what tc level unlocks hero gear",
+        ],
+        "all_of": [["what"], TC, ["hero gear"]],
+        "embed": {
+            "title": "🏰 What TC level is required for hero gear?",
+            "description": ("• **TC15** is required for hero gear.\n"
+                            "• **TC20** is required for hero gear mastery foraging.\n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "tc_governor_gear",
+        "examples": [
+            "what tc level unlocks governor gear",
+        ],
+        "all_of": [["what"], TC, ["governor gear"]],
+        "embed": {
+            "title": "🏰 What TC level is required for governor gear?",
+            "description": ("• **TC22** is required for governor gear.\n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "tc_charms",
+        "examples": [
+            "what tc level unlocks charms",
+        ],
+        "all_of": [["what"], TC, ["charm"]],
+        "embed": {
+            "title": "🏰 What TC level is required for charms?",
+            "description": ("• **TC25** is required for governor charms\n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "fishing",
+        "examples": [
+            "how often is the fishing event",
+            "when is fishing",
+        ],
+        "any_of": [[["how"], ["often"], ["fishing"]], [["when"], ["is"], ["fishing"]]],
+        "embed": {
+            "title": "🎣 How often is the fishing even?",
+            "description": ("The fishing event is **monthly**\n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "hall_of_governors",
+        "examples": [
+            "how often is hall of governors",
+            "when is the next hog",
+        ],
+        "any_of": [[["how"], ["often"], ["hall of governors", "hog"]], [["when"], ["is"], ["hall of governors", "hog"]]],
+        "embed": {
+            "title": "🏰 How often is the Hall of Governors event?",
+            "description": ("The Hall of Governors event is generally every **2 weeks**\n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "swordland",
+        "examples": [
+            "how often is swordland",
+            "when is swordland showdown",
+        ],
+        "any_of": [[["how"], ["often"], ["swordland"]], [["when"], ["is"], ["swordland"]]],
+        "embed": {
+            "title": "⚔️ How often is the Swordland Sowdown event?",
+            "description": ("The Swordland event is generally every **2 weeks**\n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "vip",
+        "examples": [
+            "how much vip xp do i need to level up",
+            "how much xp for each vip level",
+        ],
+        "any_of": [[["^what", "^how"], ["vip"], ["cost", "requirements"]], [["^what", "^how"], ["vip"], ["much"], ["xp"]]],
+        "embed": {
+            "title": "💎 What are the VIP requirements?",
+            "color": 0x3498db,
+            "image": "https://i.imgur.com/YLhEDYv.png",
+            "asset": "vipRequirements.png",
+        },
+    },
+    {
+        "intent": "banner_refund",
+        "examples": [
+            "how many resources do you get back when you destroy a banner",
+        ],
+        "all_of": [["how"], ["much", "many"], ["res", "resources"], ["banner", "flag"], ["destroy", "dismantle"]],
+        "embed": {
+            "title": "🏴 How many resources are refunded when you destroy a banner?",
+            "description": ("You get **10%** of the resources back from destroying a banner.\n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "hero_shards",
+        "examples": [
+            "what are spare hero shards for",
+            "can i sell leftover shards",
+        ],
+        "all_of": [["can", "what", "?"], ["do", "use"], ["extra", "leftover"], ["hero shards", "shards"]],
+        "embed": {
+            "title": "🦸‍♂️ Can I do anything with extra hero shards?",
+            "description": ("Yes there is an event called **Champagne Fair** where you can exchange extra hero shards for tickets.\n"
+                            "1 rare shard = 6 tickets\n"
+                            "1 epic shard = 10 tickets\n"
+                            "1 legendary shard = 200 tickets\n"),
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "purchases_transfer",
+        "examples": [
+            "do bought packs carry over if i switch servers",
+            "will my packs move to my new character",
+        ],
+        "all_of": [["do", "will", "?"], ["purchases", "items", "packs"], ["transfer", "move"], ["account", "server", "state"]],
+        "embed": {
+            "title": "💰 Do purchases on account transfer to new servers?",
+            "description": ("No, purchases made on an account do not transfer to new servers. Items and packs are tied to the state/character where they were purchased."),
+            "color": 0xe74c3c,
+        },
+    },
+    {
+        "intent": "ke_days",
+        "examples": [
+            "what is the length of ke",
+            "how long does the kill event last",
+            "how long is all out",
+        ],
+        "all_of": [["how many", "?", "how long", "how often"], ["dayz", "days", "long"], ["ke", "kill event", "all out", "allout"]],
+        "embed": {
+            "title": "⚔️ How many days is KE?",
+            "description": ("The Kill Event (All Out), lasts for **2 days**.\n"
+                            "It is generally every **2 weeks** and takes place onf Friday to Saturday.\n"),
+            "color": 0xe74c3c,
+        },
+    },
+    {
+        "intent": "suggestion",
+        "examples": [
+            "can i suggest a feature",
+            "where can i give feedback",
+        ],
+        "all_of": [["how", "where", "?"], ["make", "give"], ["suggestion", "feedback"]],
+        "embed": {
+            "title": "💡 How to make a suggestion?",
+            "description": "See the **#feedback** channel to share your suggestions!",
+            "color": 0x3498db,
+        },
+    },
+    {
+        # "burst of life" always contains both "burst" and "life"
+        "intent": "burst_of_life",
+        "examples": [
+            "where does the burst of life skin come from",
+        ],
+        "all_of": [["how", "?"], ["get", "unlock"], ["burst"], ["life"]],
+        "embed": {
+            "title": "🌟 How to get the Burst of Life skin?",
+            "description": "Reach **4M power** during the **Rookies Growth** event in the first week of a state.",
+            "color": 0x3498db,
+        },
+    },
+    {
+        "intent": "charm_event",
+        "examples": [
+            "which event rewards charm upgrades",
+        ],
+        "all_of": [["is there", "?"], ["event"], ["charms"]],
+        "embed": {
+            "title": "🏰 Is there an event for upgrading charms?",
+            "description": "The 4th Hall of Governors has a day for upgrading charms.",
+            "color": 0x3498db,
+        },
+    },
+]
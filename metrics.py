@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import os
+from bisect import bisect_left
+
+log = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds, from microsecond matching up to slow REST calls
+LATENCY_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _labels(label: str | None, value) -> str:
+    return f'{{{label}="{value}"}}' if label else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label: str | None = None):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.values = {}
+
+    def inc(self, label_value=None, amount: int = 1):
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def total(self) -> int:
+        return sum(self.values.values())
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        if self.label is None:
+            yield f"{self.name} {self.values.get(None, 0)}"
+            return
+        for label_value, value in sorted(self.values.items(), key=lambda item: str(item[0])):
+            yield f"{self.name}{_labels(self.label, label_value)} {value}"
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, read):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.read()}"
+
+
+class Histogram:
+    """Fixed-bucket histogram: observe() is one bisect and three additions."""
+
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given quantile."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{le="{bound:g}"}} {cumulative}'
+        yield f'{self.name}_bucket{{le="+Inf"}} {self.count}'
+        yield f"{self.name}_sum {self.sum:.9f}"
+        yield f"{self.name}_count {self.count}"
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text format."""
+
+    def __init__(self, prefix: str = "helpbot"):
+        self.prefix = prefix
+        self.metrics = {}
+        self._task = None
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label: str | None = None) -> Counter:
+        return self._add(Counter(f"{self.prefix}_{name}", help_text, label))
+
+    def histogram(self, name: str, help_text: str, buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(f"{self.prefix}_{name}", help_text, buckets))
+
+    def gauge(self, name: str, help_text: str, read) -> Gauge:
+        return self._add(Gauge(f"{self.prefix}_{name}", help_text, read))
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics.values() for line in metric.render()) + "\n"
+
+    def write(self, path: str, text: str | None = None):
+        # Write then rename so a scraper never reads a half-written file
+        text = self.render() if text is None else text
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    async def flush_periodically(self, path: str, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            # Rendered on the loop, gauges and label dicts change under a worker thread; only the file I/O runs there
+            text = self.render()
+            try:
+                await asyncio.to_thread(self.write, path, text)
+            except OSError:
+                log.exception("Writing metrics to %s failed", path)
+
+    def start_flush(self, path: str, interval: float = 15.0):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.flush_periodically(path, interval))
+        return self._task
+
+
+METRICS = MetricsRegistry()
+
+messages_seen = METRICS.counter("messages_seen_total", "Messages received from other users.")
+messages_dropped = METRICS.counter("messages_dropped_total", "Messages ignored before matching, by channel or prefilter tier.",
+                                   label="reason")
+intent_hits = METRICS.counter("intent_hits_total", "Answers produced per intent.", label="intent")
+fallback_hits = METRICS.counter("fallback_hits_total", "Answers found by the fallback classifier per intent.", label="intent")
+response_cache_lookups = METRICS.counter("response_cache_lookups_total", "Response cache lookups.", label="result")
+repeat_answers = METRICS.counter("repeat_answers_total", "Repeat questions pointed at an earlier answer.", label="intent")
+match_seconds = METRICS.histogram("match_seconds", "Time spent matching a message against the rules.")
+embed_build_seconds = METRICS.histogram("embed_build_seconds", "Time spent building answer embeds.")
+plugin_seconds = METRICS.histogram("plugin_seconds", "Time spent in responder plugins like show.me.")
+asset_uploads = METRICS.counter("asset_uploads_total", "Response images uploaded to the asset channel.")
+send_seconds = METRICS.histogram("discord_send_seconds", "Discord REST time for sending a reply.")
+reaction_seconds = METRICS.histogram("discord_reaction_seconds", "Discord REST time for adding a reaction.")
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import discord
+
+import metrics
+
+log = logging.getLogger(__name__)
+
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord limit
+MAX_EMBED_CHARACTERS = 6000  # Discord limit on the text of all embeds in one message, as counted by len(embed)
+REACTIONS = ("👍", "👎")
+
+
+class RateLimitBucket:
+    """Client-side token bucket pacing the sends to one channel.
+
+    discord.py already waits out any 429 itself. Pacing here keeps replies
+    waiting in the channel's queue, where a backlog can be coalesced into
+    one message instead of being sent one by one.
+    """
+
+    def __init__(self, rate: int = 5, per: float = 5.0):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+
+
+@dataclass
+class OutboundReply:
+    channel: discord.abc.Messageable
+    embed: discord.Embed
+    received_at: float
+    intent: str | None = None
+    reactions: tuple = REACTIONS
+    message: discord.Message | None = None  # set once the reply has been sent
+    failed: bool = False  # set if sending it failed, the reply will never have a message
+
+
+def percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class OutboundQueue:
+    """Per-channel reply queues with send pacing.
+
+    Each channel gets a worker while it has pending replies. When replies
+    back up, the worker coalesces as many as fit in one message (ten embeds,
+    6000 characters between them). A combined message gets every reaction
+    any of its replies asked for, added in the background so they never
+    hold up the next reply. depth and latencies (seconds from receiving the question to the
+    reply being sent) are exposed for monitoring. on_sent(message, replies)
+    is called for every message that made it to Discord.
+    """
+
+    def __init__(self, rate: int = 5, per: float = 5.0, latency_samples: int = 1000, on_sent=None):
+        self.rate = rate
+        self.on_sent = on_sent
+        self.per = per
+        self.latencies = deque(maxlen=latency_samples)
+        self.sent_messages = 0
+        self.sent_replies = 0
+        self.failed_replies = 0
+        self._queues = {}
+        self._buckets = {}
+        self._workers = {}
+        self._background = set()
+
+    @property
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def channel_depth(self, channel_id: int) -> int:
+        queue = self._queues.get(channel_id)
+        return len(queue) if queue else 0
+
+    def latency_percentiles(self) -> dict:
+        samples = list(self.latencies)
+        return {"p50": percentile(samples, 0.50), "p90": percentile(samples, 0.90), "p99": percentile(samples, 0.99)}
+
+    def enqueue(self, channel, embed: discord.Embed, received_at: float | None = None, intent: str | None = None,
+                reactions: tuple = REACTIONS):
+        reply = OutboundReply(channel, embed, received_at if received_at is not None else time.monotonic(), intent,
+                              reactions)
+        self._queues.setdefault(channel.id, deque()).append(reply)
+        worker = self._workers.get(channel.id)
+        if worker is None or worker.done():
+            self._workers[channel.id] = asyncio.get_running_loop().create_task(self._drain(channel.id))
+        return reply
+
+    async def _drain(self, channel_id: int):
+        queue = self._queues[channel_id]
+        bucket = self._buckets.setdefault(channel_id, RateLimitBucket(self.rate, self.per))
+        while queue:
+            batch = [queue.popleft()]
+            characters = len(batch[0].embed)
+            while (queue and len(batch) < MAX_EMBEDS_PER_MESSAGE
+                   and characters + len(queue[0].embed) <= MAX_EMBED_CHARACTERS):
+                characters += len(queue[0].embed)
+                batch.append(queue.popleft())
+            try:
+                await self._send(bucket, batch)
+            except Exception:
+                # One bad batch must not end the worker and strand the replies queued behind it
+                log.exception("Sending %d replies to channel %s failed", len(batch), channel_id)
+                self._failed(batch)
+
+    def _failed(self, batch: list):
+        for reply in batch:
+            reply.failed = True
+        self.failed_replies += len(batch)
+
+    async def _send(self, bucket: RateLimitBucket, batch: list):
+        channel = batch[0].channel
+        embeds = [reply.embed for reply in batch]
+        await bucket.acquire()
+        start = time.perf_counter()
+        try:
+            # 429s are retried inside discord.py, so an exception here means the send failed for good
+            if len(embeds) == 1:
+                sent_message = await channel.send(embed=embeds[0])
+            else:
+                sent_message = await channel.send(embeds=embeds)
+            metrics.send_seconds.observe(time.perf_counter() - start)
+        except discord.HTTPException:
+            log.exception("Failed to send %d replies to channel %s", len(batch), channel.id)
+            self._failed(batch)
+            return
+
+        now = time.monotonic()
+        for reply in batch:
+            reply.message = sent_message
+        self.latencies.extend(now - reply.received_at for reply in batch)
+        self.sent_messages += 1
+        self.sent_replies += len(batch)
+        if self.on_sent is not None:
+            self.on_sent(sent_message, batch)
+
+        reactions = tuple(dict.fromkeys(reaction for reply in batch for reaction in reply.reactions))
+        if not reactions:
+            return
+        task = asyncio.get_running_loop().create_task(self._react(sent_message, reactions))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _react(self, message: discord.Message, reactions):
+        for reaction in reactions:
+            start = time.perf_counter()
+            try:
+                await message.add_reaction(reaction)
+                metrics.reaction_seconds.observe(time.perf_counter() - start)
+            except discord.HTTPException:
+                log.exception("Failed to add reaction %s to message %s", reaction, message.id)
+                return
@@ -0,0 +1,81 @@
+import asyncio
+import importlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import metrics
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Plugin:
+    name: str
+    trigger: str  # casefolded text that must appear in the message
+    respond: object  # respond(content) -> discord.Embed | None
+    blocking: bool = False  # True for responders doing I/O or heavy work, they run in the thread pool
+
+
+class PluginRegistry:
+    """In-process responders for commands like show.me.
+
+    Each module in `modules` has a register(registry) function that adds
+    its plugins. Modules are imported the first time a message is checked,
+    so a responder costs nothing until it's needed. Plain responders are
+    called inline; blocking ones run in a small thread pool so they never
+    stall the event loop.
+    """
+
+    def __init__(self, modules=(), max_workers: int = 4, asset_url=None):
+        self.modules = tuple(modules)
+        self.max_workers = max_workers
+        # asset_url(name, fallback) -> URL of an uploaded response image, for responders to use
+        self.asset_url = asset_url or (lambda name, fallback: fallback)
+        self.plugins = []
+        self._discovered = False
+        self._executor = None
+
+    def add(self, name: str, trigger: str, respond, blocking: bool = False) -> Plugin:
+        plugin = Plugin(name, trigger.casefold(), respond, blocking)
+        self.plugins.append(plugin)
+        return plugin
+
+    def discover(self):
+        if self._discovered:
+            return
+        self._discovered = True
+        for module_name in self.modules:
+            try:
+                importlib.import_module(module_name).register(self)
+            except Exception:
+                log.exception("Loading responder module %s failed", module_name)
+
+    def find(self, content: str) -> Plugin | None:
+        self.discover()
+        content = content.casefold()
+        for plugin in self.plugins:
+            if plugin.trigger in content:
+                return plugin
+        return None
+
+    async def run(self, plugin: Plugin, content: str):
+        start = time.perf_counter()
+        try:
+            if plugin.blocking:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="plugin")
+                embed = await asyncio.get_running_loop().run_in_executor(self._executor, plugin.respond, content)
+            else:
+                embed = plugin.respond(content)
+        except Exception:
+            log.exception("Responder %s failed on %r", plugin.name, content)
+            return None
+        metrics.plugin_seconds.observe(time.perf_counter() - start)
+        return embed
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
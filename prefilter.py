@@ -0,0 +1,43 @@
+import re
+
+from ruleEngine import keyword_probe
+
+WORD_CHARACTER = re.compile(r"\w")  # nothing without one casefolds to a letter or digit
+ALPHANUMERIC_RUN = re.compile(r"[a-z0-9]+")
+
+
+class Prefilter:
+    """Rules out messages no trigger or fallback could answer, on the raw text.
+
+    check() returns the tier that ruled a message out, or None when it has
+    to go through the full path:
+    - "characters": no letters or digits at all, like emoji or "??"
+    - "length": shorter than every trigger and than the fallback's minimum
+    - "vocabulary": too short for the fallback and missing every trigger's
+      longest word, found with one case-insensitive trie search
+    Triggers match anywhere in the normalized text ("tc25", "codes"), which
+    keeps every word of a trigger intact, so the search looks for those
+    words rather than intersecting whole message words. The last two tiers
+    only apply to ASCII, casefolding can lengthen other text ("ß" -> "ss").
+    """
+
+    def __init__(self, triggers, fallback_min_length: int):
+        words = [ALPHANUMERIC_RUN.findall(trigger.casefold()) for trigger in triggers]
+        # A trigger without letters or digits could be in any message
+        self.enabled = bool(words) and all(words)
+        self.min_length = min([fallback_min_length] + [len(trigger) for trigger in triggers])
+        self.fallback_min_length = fallback_min_length
+        self._probe = keyword_probe({max(runs, key=len) for runs in words}, re.IGNORECASE) if self.enabled else None
+
+    def check(self, content: str) -> str | None:
+        if not self.enabled:
+            return None
+        if not content.isascii():
+            return None if WORD_CHARACTER.search(content) else "characters"
+        if len(content) < self.min_length:
+            return "length"
+        if not WORD_CHARACTER.search(content):
+            return "characters"
+        if len(content) < self.fallback_min_length and not self._probe.search(content):
+            return "vocabulary"
+        return None
@@ -0,0 +1,134 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import sys
+
+from aiohttp import web
+
+from dataWatcher import DataFileWatcher
+import helpEngine
+
+MAX_BATCH = 1000  # questions per request
+
+
+def embed_to_answer(question: str, intent: str | None, embed) -> dict:
+    if embed is None:
+        return {"question": question, "intent": None}
+    return {
+        "question": question,
+        "intent": intent,
+        "title": embed.title,
+        "description": embed.description,
+        "fields": [{"name": field.name, "value": field.value} for field in embed.fields],
+        "image": embed.image.url,
+        "color": embed.color.value if embed.color else None,
+    }
+
+
+async def answer_batch(questions) -> list:
+    """Answers for a batch of questions, the same ones the bot would post.
+
+    Questions repeated within a batch are only matched once.
+    """
+    answers = {}
+    results = []
+    for question in questions:
+        answer = answers.get(question)
+        if answer is None:
+            plugin = helpEngine.plugins.find(question)
+            intent, embed = None, None
+            if plugin is not None:
+                embed = await helpEngine.plugins.run(plugin, question)
+                intent = plugin.name if embed else None
+            if not embed:
+                intent, embed = helpEngine.get_intent_response(question)
+            answer = answers[question] = embed_to_answer(question, intent, embed)
+        results.append(answer)
+    return results
+
+
+def parse_questions(payload) -> list:
+    # Accepts "question", ["q1", "q2"], {"question": "q"} or {"questions": [...]}
+    if isinstance(payload, dict):
+        payload = payload.get("questions", payload.get("question"))
+    if isinstance(payload, str):
+        payload = [payload]
+    if not isinstance(payload, list) or not all(isinstance(question, str) for question in payload):
+        raise ValueError("expected a question or a list of questions")
+    if len(payload) > MAX_BATCH:
+        raise ValueError(f"at most {MAX_BATCH} questions per request")
+    return payload
+
+
+# HTTP
+
+async def query(request: web.Request) -> web.Response:
+    try:
+        if request.method == "GET":
+            questions = parse_questions(request.query.getall("q", []))
+        else:
+            questions = parse_questions(await request.json(loads=json.loads))
+    except ValueError as e:  # includes malformed JSON
+        return web.json_response({"error": str(e)}, status=400)
+    return web.json_response({"answers": await answer_batch(questions)})
+
+
+async def start_background_tasks(app: web.Application):
+    # Load the engine off the loop, then keep the data files hot-reloaded the same as the bot does
+    await asyncio.to_thread(helpEngine.preload)
+    data_watcher = DataFileWatcher(interval=5.0)
+    helpEngine.watch_data_files(data_watcher)
+    data_watcher.start()
+    helpEngine.gift_code_index.start()
+
+
+def make_app() -> web.Application:
+    app = web.Application()
+    app.router.add_get("/query", query)
+    app.router.add_post("/query", query)
+    app.on_startup.append(start_background_tasks)
+    return app
+
+
+# JSON lines
+
+async def serve_json_lines(stdin, stdout):
+    """Answer one JSON question (or list of questions) per input line.
+
+    A string or {"question": ...} gets one answer object back, a list or
+    {"questions": [...]} gets a list. Reading stdin blocks the loop, which
+    is fine here: nothing else runs on it.
+    """
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            payload = json.loads(line)
+            answers = await answer_batch(parse_questions(payload))
+        except ValueError as e:
+            stdout.write(json.dumps({"error": str(e)}) + "\n")
+        else:
+            single = isinstance(payload, str) or (isinstance(payload, dict) and "questions" not in payload)
+            stdout.write(json.dumps(answers[0] if single else answers) + "\n")
+        stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer help questions over HTTP or as JSON lines on stdin/stdout.")
+    parser.add_argument("--http", action="store_true", help="serve POST/GET /query instead of reading stdin")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    if args.http:
+        web.run_app(make_app(), host=args.host, port=args.port, keepalive_timeout=75)
+    else:
+        with contextlib.suppress(KeyboardInterrupt):
+            asyncio.run(serve_json_lines(sys.stdin, sys.stdout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import re
+import time
+from collections import OrderedDict
+
+# Runs of punctuation at the start or end of a word ("codes?!", "...when")
+EDGE_PUNCTUATION = re.compile(r"(?<!\S)[^\w\s]+|[^\w\s]+(?!\S)")
+WHITESPACE = re.compile(r"\s+")
+
+
+class ResponseCache:
+    """Bounded LRU of normalized question -> (intent, embed).
+
+    normalize() casefolds, collapses whitespace and drops punctuation around
+    words, except for the characters in keep (the punctuation the rules
+    themselves look for, like "?" and "-"). Punctuation inside a word such
+    as "2.5" or "15-25" is left alone, so answers can be computed from the
+    normalized text and every question sharing a key gets the same answer.
+    Messages without an answer are cached too, repeated chatter is just as common.
+    """
+
+    def __init__(self, capacity: int = 2048, keep=()):
+        self.capacity = capacity
+        self.keep = frozenset(keep)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def _strip(self, match) -> str:
+        kept = [ch for ch in dict.fromkeys(match.group()) if ch in self.keep]
+        return "".join(kept)
+
+    def normalize(self, content: str) -> str:
+        content = EDGE_PUNCTUATION.sub(self._strip, content.casefold())
+        return WHITESPACE.sub(" ", content).strip()
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, intent: str | None, embed):
+        self._entries[key] = (intent, embed)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        # Called whenever the data behind the answers changes
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RecentAnswers:
+    """Answers posted per channel in the last `window` seconds.
+
+    Lets a question that was answered moments ago in the same channel be
+    pointed at the earlier answer instead of posting it again.
+    """
+
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        self._channels = {}  # channel id -> {answer key: (answered at, reply)}
+
+    def find(self, channel_id: int, key, now: float | None = None):
+        answers = self._channels.get(channel_id)
+        if not answers:
+            return None
+        now = time.monotonic() if now is None else now
+        entry = answers.get(key)
+        if entry is None or now - entry[0] >= self.window:
+            return None
+        return entry[1]
+
+    def record(self, channel_id: int, key, reply, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        answers = self._channels.setdefault(channel_id, {})
+        for old_key in [old_key for old_key, (answered_at, _) in answers.items() if now - answered_at >= self.window]:
+            del answers[old_key]
+        answers[key] = (now, reply)
@@ -0,0 +1,138 @@
+import re
+from dataclasses import dataclass
+
+# Terms starting with this marker only match at the start of the message,
+# e.g. "^how" is the table form of content.startswith("how").
+PREFIX_MARKER = "^"
+
+
+@dataclass(frozen=True)
+class Rule:
+    index: int
+    intent: str
+    clauses: tuple  # alternatives, each a tuple of keyword groups (frozensets)
+    embed: dict | None = None
+    handler: str | None = None
+
+    def matches(self, present: set) -> bool:
+        # A clause holds when every one of its groups has at least one term present
+        for clause in self.clauses:
+            for group in clause:
+                if present.isdisjoint(group):
+                    break
+            else:
+                return True
+        return False
+
+
+def _build_trie(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return trie
+
+
+def _trie_pattern(node) -> str:
+    # Children are tried before ending the word so each position yields its longest keyword
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return f"(?:{body})?"
+    return body
+
+
+def keyword_probe(keywords, flags: int = 0):
+    """One regex whose search() finds any of keywords, compiled as a trie."""
+    return re.compile(_trie_pattern(_build_trie(keywords)), flags)
+
+
+def _strip_prefix(term: str) -> str:
+    return term[len(PREFIX_MARKER):] if term.startswith(PREFIX_MARKER) else term
+
+
+class IntentMatcher:
+    """Single-pass matcher compiled from a declarative rule table.
+
+    Every keyword in the table goes into one trie-shaped regex, so a message is
+    scanned once to collect the keywords it contains. Only the rules indexed
+    under one of those keywords are evaluated, in their original table order.
+    Messages without any anchor keyword are rejected before the full scan.
+    """
+
+    def __init__(self, rules):
+        self.rules = []
+        for index, spec in enumerate(rules):
+            clauses = spec.get("any_of") or [spec["all_of"]]
+            self.rules.append(Rule(
+                index=index,
+                intent=spec["intent"],
+                clauses=tuple(tuple(frozenset(group) for group in clause) for clause in clauses),
+                embed=spec.get("embed"),
+                handler=spec.get("handler"),
+            ))
+
+        terms = {term for rule in self.rules for clause in rule.clauses for group in clause for term in group}
+        keywords = {_strip_prefix(term) for term in terms}
+        self.keywords = frozenset(keywords)
+        prefix_keywords = {_strip_prefix(term) for term in terms if term.startswith(PREFIX_MARKER)}
+
+        # Every keyword found at a position implies the shorter keywords it starts with
+        self._implied = {}
+        self._implied_at_start = {}
+        for keyword in keywords:
+            shorter = [other for other in keywords if keyword.startswith(other)]
+            self._implied[keyword] = frozenset(shorter)
+            self._implied_at_start[keyword] = frozenset(
+                shorter + [PREFIX_MARKER + other for other in shorter if other in prefix_keywords]
+            )
+
+        self._scanner = re.compile("(?=(" + _trie_pattern(_build_trie(keywords)) + "))")
+
+        # Each clause is indexed under the terms of its most selective group
+        index = {}
+        for rule in self.rules:
+            for clause in rule.clauses:
+                anchor = max(clause, key=lambda group: min(len(_strip_prefix(term)) for term in group))
+                for term in anchor:
+                    index.setdefault(term, set()).add(rule.index)
+        self._index = {term: frozenset(rule_ids) for term, rule_ids in index.items()}
+
+        # No rule can fire without one of its anchor terms, so most chatter stops at this search
+        self.anchor_keywords = frozenset(_strip_prefix(term) for term in self._index)
+        self._anchor_probe = keyword_probe(self.anchor_keywords)
+
+    def scan(self, content: str) -> set:
+        present = set()
+        for match in self._scanner.finditer(content):
+            if match.start() == 0:
+                present |= self._implied_at_start[match.group(1)]
+            else:
+                present |= self._implied[match.group(1)]
+        return present
+
+    def iter_matches(self, content: str):
+        """Yield the rules matching already casefolded content, in table order."""
+        if not self._anchor_probe.search(content):
+            return
+        present = self.scan(content)
+        candidates = set()
+        for term in present:
+            rule_ids = self._index.get(term)
+            if rule_ids:
+                candidates |= rule_ids
+        for rule_id in sorted(candidates):
+            rule = self.rules[rule_id]
+            if rule.matches(present):
+                yield rule
+
+    def match(self, content: str) -> Rule | None:
+        return next(self.iter_matches(content), None)
+
+
+def compile_rules(rules) -> IntentMatcher:
+    return IntentMatcher(rules)
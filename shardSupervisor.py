@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import signal
+import sys
+import time
+
+log = logging.getLogger("shardSupervisor")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+IDENTIFY_INTERVAL = 5.5  # Discord allows one shard to identify every 5 seconds
+MAX_BACKOFF = 60.0
+STABLE_AFTER = 60.0  # a worker that ran this long resets its restart backoff
+
+
+def split_shards(shard_count: int, workers: int) -> list:
+    """Contiguous shard ranges, one per worker, as even as possible."""
+    size, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for worker in range(workers):
+        end = start + size + (1 if worker < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return [shard_ids for shard_ids in ranges if shard_ids]
+
+
+class Worker:
+    def __init__(self, index: int, shard_ids, shard_count: int, health_dir: str):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.health_file = os.path.join(health_dir, f"worker-{index}.json")
+        self.process = None
+        self.started_at = 0.0
+        self.restarts = 0
+
+    def env(self) -> dict:
+        env = dict(os.environ)
+        env.update({
+            "SHARD_COUNT": str(self.shard_count),
+            "SHARD_IDS": ",".join(map(str, self.shard_ids)),
+            "SHARD_HEALTH_FILE": self.health_file,
+            "METRICS_FILE": f"helpbot-worker-{self.index}.prom",
+        })
+        return env
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(sys.executable, os.path.join(ROOT, "helpBot.py"),
+                                                            cwd=ROOT, env=self.env())
+        self.started_at = time.monotonic()
+        log.info("Worker %d (shards %s) started as pid %d", self.index, self.shard_ids, self.process.pid)
+
+    def health(self) -> dict | None:
+        try:
+            with open(self.health_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+class ShardSupervisor:
+    """Runs the bot's shards across worker processes and keeps them alive.
+
+    Each worker is a helpBot.py process running an AutoShardedBot over its
+    slice of the shards, with its own copy of the TC table and gift codes.
+    Crashed workers are restarted with exponential backoff, and the health
+    files the workers write are merged into a per-shard report.
+    """
+
+    def __init__(self, shard_count: int, workers: int, health_dir: str = "health", report_interval: float = 30.0):
+        os.makedirs(health_dir, exist_ok=True)
+        self.report_interval = report_interval
+        self.report_file = os.path.join(health_dir, "report.json")
+        self.workers = [Worker(index, shard_ids, shard_count, health_dir)
+                        for index, shard_ids in enumerate(split_shards(shard_count, workers))]
+        self._stopping = False
+
+    async def keep_alive(self, worker: Worker, delay: float):
+        # Workers identify one after another so their shards don't trip the identify limit
+        await asyncio.sleep(delay)
+        backoff = 1.0
+        while not self._stopping:
+            await worker.start()
+            code = await worker.process.wait()
+            if self._stopping:
+                return
+            if time.monotonic() - worker.started_at > STABLE_AFTER:
+                backoff = 1.0
+            worker.restarts += 1
+            log.warning("Worker %d exited with %s, restarting in %.0fs", worker.index, code, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(MAX_BACKOFF, backoff * 2)
+
+    def report(self) -> dict:
+        now = time.time()
+        shards = {}
+        for worker in self.workers:
+            health = worker.health() or {}
+            age = now - health["time"] if "time" in health else None
+            for shard_id in worker.shard_ids:
+                shard = health.get("shards", {}).get(str(shard_id), {})
+                latency = shard.get("latency")
+                shards[shard_id] = {
+                    "worker": worker.index,
+                    "pid": worker.process.pid if worker.process else None,
+                    "running": worker.process is not None and worker.process.returncode is None,
+                    "restarts": worker.restarts,
+                    "latency_ms": round(latency * 1000, 1) if latency is not None and math.isfinite(latency) else None,
+                    "closed": shard.get("closed"),
+                    "guilds": shard.get("guilds"),
+                    "health_age": round(age, 1) if age is not None else None,
+                }
+        return {"time": now, "shards": shards}
+
+    async def report_periodically(self):
+        while not self._stopping:
+            await asyncio.sleep(self.report_interval)
+            report = self.report()
+            with open(f"{self.report_file}.tmp", "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            os.replace(f"{self.report_file}.tmp", self.report_file)
+            for shard_id, shard in sorted(report["shards"].items()):
+                log.info("Shard %d: worker %d %s, latency %s ms, %s guilds, %d restarts", shard_id, shard["worker"],
+                         "running" if shard["running"] else "down", shard["latency_ms"], shard["guilds"],
+                         shard["restarts"])
+
+    def stop(self):
+        self._stopping = True
+        for worker in self.workers:
+            if worker.process is not None and worker.process.returncode is None:
+                worker.process.terminate()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                pass  # Windows: Ctrl+C still stops the workers through the console
+        delay = 0.0
+        tasks = []
+        for worker in self.workers:
+            tasks.append(asyncio.create_task(self.keep_alive(worker, delay)))
+            delay += len(worker.shard_ids) * IDENTIFY_INTERVAL
+        reporter = asyncio.create_task(self.report_periodically())
+        await asyncio.gather(*tasks)
+        reporter.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run HelpBot's shards across several worker processes.")
+    parser.add_argument("--shards", type=int, required=True, help="total shard count")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--health-dir", default="health", help="where workers write health files")
+    parser.add_argument("--report-interval", type=float, default=30.0, help="seconds between shard reports")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    supervisor = ShardSupervisor(args.shards, min(args.workers, args.shards), args.health_dir, args.report_interval)
+    asyncio.run(supervisor.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,37 @@
 import sys
 import json
 
-def get_show_me_response(content: str):
+import discord
+
+VIP_REQUIREMENTS_IMAGE = "https://i.imgur.com/YLhEDYv.png"
+
+def external_url(name: str, fallback: str) -> str:
+    return fallback
+
+def get_show_me_response(content: str, asset_url=external_url):
     content = content.casefold()
 
     if "vip" in content and ("requirements" in content or "req" in content):
-        return {
-            "title": "💎 VIP requirements",
-            "description": None,
-            "image_url": "https://i.imgur.com/YLhEDYv.png",
-            "color": 0x3498db
-        }
+        embed = discord.Embed(
+            title="💎 VIP requirements",
+            description=None,
+            color=0x3498db
+        )
+        embed.set_image(url=asset_url("vipRequirements.png", VIP_REQUIREMENTS_IMAGE))
+        return embed
+
+def register(registry):
+    # The registry hands over the uploaded-image lookup, so this module doesn't import the engine
+    registry.add("show_me", "show.me", lambda content: get_show_me_response(content, registry.asset_url))
 
 if __name__ == "__main__":
     content = " ".join(sys.argv[1:])
     response = get_show_me_response(content)
 
     if response:
-        print(json.dumps(response))
+        print(json.dumps({
+            "title": response.title,
+            "description": response.description,
+            "image_url": response.image.url,
+            "color": response.color.value
+        }))
@@ -0,0 +1,96 @@
+import re
+from array import array
+
+RESOURCES = ("Bread", "Wood", "Coal", "Iron")
+
+TIME_UNITS = {
+    "day": 86400,
+    "hour": 3600,
+    "minute": 60,
+    "second": 1,
+}
+TIME_PATTERN = re.compile(r"(\d+)\s*(day|hour|minute|second)")
+
+
+def parse_time_to_seconds(text: str) -> int:
+    return sum(int(amount) * TIME_UNITS[unit] for amount, unit in TIME_PATTERN.findall(text))
+
+
+def parse_amount(text: str) -> int:
+    text = text.strip().replace(",", "")
+    return int(text) if text.isdigit() else 0  # "N/A" means the resource isn't needed
+
+
+class TCTable:
+    """Town Center requirements parsed once into numeric columns.
+
+    Resources and upgrade times live in array("q") columns with matching
+    prefix sums, so the cost of any range of upgrades is two lookups.
+    """
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: row[0])
+        self.levels = array("q", (row[0] for row in rows))
+        self.prerequisites = [row[1] for row in rows]
+        self.columns = {name: array("q", (row[2][name] for row in rows)) for name in RESOURCES}
+        self.columns["Upgrade Time"] = array("q", (row[3] for row in rows))
+        self._positions = {level: i for i, level in enumerate(self.levels)}
+
+        # cumulative[name][i] is the total of the first i rows
+        self.cumulative = {}
+        for name, column in self.columns.items():
+            totals = array("q", [0])
+            for value in column:
+                totals.append(totals[-1] + value)
+            self.cumulative[name] = totals
+
+    def __contains__(self, level) -> bool:
+        return level in self._positions
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    @property
+    def min_level(self) -> int:
+        return self.levels[0]
+
+    @property
+    def max_level(self) -> int:
+        return self.levels[-1]
+
+    def row(self, level: int) -> dict:
+        i = self._positions[level]
+        data = {name: column[i] for name, column in self.columns.items()}
+        data["Prerequisites"] = self.prerequisites[i]
+        return data
+
+    def _rows_upto(self, level: int) -> int:
+        if level < self.min_level:
+            return 0
+        return self._positions[level] + 1
+
+    def range_totals(self, start: int, end: int) -> dict:
+        """Totals for upgrading from level start to level end (rows start+1 .. end)."""
+        lo, hi = self._rows_upto(start), self._rows_upto(end)
+        return {name: totals[hi] - totals[lo] for name, totals in self.cumulative.items()}
+
+
+def load_tc_requirements(path="tcReqirements.txt") -> TCTable:
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+        for number, line in enumerate(lines[1:], 2):  # Skip header
+            if not line.strip():
+                continue
+            # A half-written file must fail here rather than load as a shorter table
+            parts = line.strip().split("|")
+            if len(parts) != 7 or not parts[0].strip().isdigit() or not parse_time_to_seconds(parts[6]):
+                raise ValueError(f"{path} line {number} is not a complete Town Center row: {line.strip()!r}")
+            resources = {name: parse_amount(value) for name, value in zip(RESOURCES, parts[2:6])}
+            rows.append((int(parts[0]), parts[1], resources, parse_time_to_seconds(parts[6])))
+    if not rows:
+        raise ValueError(f"No Town Center levels found in {path}")
+    levels = sorted(row[0] for row in rows)
+    if levels != list(range(levels[0], levels[0] + len(levels))):
+        raise ValueError(f"Town Center levels in {path} are not contiguous from {levels[0]} to {levels[-1]}")
+    return TCTable(rows)